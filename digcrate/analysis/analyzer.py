@@ -1,74 +1,115 @@
 """Audio analysis: BPM, key, energy, duration extraction using librosa."""
 
 import hashlib
+import math
+import mmap
+import multiprocessing
+import os
 import re
+import warnings
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 import librosa
 import mutagen
 import numpy as np
+import soundfile as sf
 
 from digcrate.analysis.camelot import CHROMA_MAJOR, CHROMA_MINOR, KEY_TO_CAMELOT, key_name_to_camelot, parse_camelot
 from digcrate.models import Track
 
 ANALYSIS_VERSION = 3
+_HASH_WINDOW = 1_048_576
+_BPM_SR = 11025
+_HPSS_SKIP_PERIODICITY = 0.2
 
 
 def file_hash(path: Path) -> str:
-    """Compute a fast hash of the first 1MB of a file for change detection."""
+    """Compute a fast hash of the first 1MB of a file for change detection.
+
+    Digests are memoized per (path, mtime, size) within a process, so an
+    in-process caller (``analyze_tracks`` with one worker, reanalysis) doesn't
+    read a file twice. Pool workers keep their own, initially empty, memo.
+    """
+    stat = os.stat(path)
+    return _file_hash_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def file_stat(path: Path) -> tuple[int, int]:
+    """Return ``(size, mtime_ns)`` for a file, or ``(0, 0)`` if it can't be stat'ed."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 0, 0
+    return stat.st_size, stat.st_mtime_ns
+
+
+@lru_cache(maxsize=4096)
+def _file_hash_cached(path: str, mtime_ns: int, size: int) -> str:
     h = hashlib.md5()
     with open(path, "rb") as f:
-        h.update(f.read(1_048_576))
+        length = min(os.fstat(f.fileno()).st_size, _HASH_WINDOW)
+        if length < 4096:
+            h.update(f.read(length))
+            return h.hexdigest()
+        try:
+            # Hash straight from the page cache instead of copying into a bytes object.
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                h.update(view)
+        except (OSError, ValueError):
+            h.update(f.read(length))
     return h.hexdigest()
 
 
+# Raw tag keys per field across containers: ID3 (MP3/AIFF/WAV), MP4, Vorbis
+# comments (FLAC/OGG/Opus, case-insensitive) and ASF (WMA), in priority order.
+_TAG_KEYS: dict[str, tuple[str, ...]] = {
+    "title": ("TIT2", "\xa9nam", "title", "Title"),
+    "artist": ("TPE1", "\xa9ART", "artist", "Author"),
+    "bpm": ("TBPM", "tmpo", "bpm", "WM/BeatsPerMinute"),
+    "key": (
+        "TKEY",
+        "initialkey",
+        "key",
+        "----:com.apple.iTunes:INITIALKEY",
+        "----:com.apple.iTunes:initialkey",
+        "WM/InitialKey",
+    ),
+}
+
+
 def read_metadata(path: Path) -> dict[str, str]:
     """Read ID3/metadata tags from an audio file."""
     result: dict[str, str] = {"title": "", "artist": "", "bpm": "", "key": ""}
 
     try:
-        easy_meta = mutagen.File(path, easy=True)
-        if easy_meta is not None:
-            result["title"] = _coerce_tag_value(easy_meta.get("title"))
-            result["artist"] = _coerce_tag_value(easy_meta.get("artist"))
-            result["bpm"] = _coerce_tag_value(easy_meta.get("bpm"))
-            result["key"] = _coerce_tag_value(easy_meta.get("initialkey")) or _coerce_tag_value(
-                easy_meta.get("key")
-            )
+        meta = mutagen.File(path)
     except Exception:
-        pass
+        meta = None
 
-    try:
-        raw_meta = mutagen.File(path, easy=False)
-        raw_tags = getattr(raw_meta, "tags", None)
-        if raw_tags is not None:
-            if not result["bpm"]:
-                result["bpm"] = (
-                    _coerce_tag_value(raw_tags.get("TBPM"))
-                    or _coerce_tag_value(raw_tags.get("tmpo"))
-                    or _coerce_tag_value(raw_tags.get("bpm"))
-                )
-            if not result["key"]:
-                result["key"] = (
-                    _coerce_tag_value(raw_tags.get("TKEY"))
-                    or _coerce_tag_value(raw_tags.get("INITIALKEY"))
-                    or _coerce_tag_value(raw_tags.get("initialkey"))
-                    or _coerce_tag_value(raw_tags.get("----:com.apple.iTunes:INITIALKEY"))
-                )
-            if not result["title"]:
-                result["title"] = _coerce_tag_value(raw_tags.get("TIT2")) or _coerce_tag_value(
-                    raw_tags.get("\xa9nam")
-                )
-            if not result["artist"]:
-                result["artist"] = _coerce_tag_value(raw_tags.get("TPE1")) or _coerce_tag_value(
-                    raw_tags.get("\xa9ART")
-                )
-    except Exception:
-        pass
+    tags = getattr(meta, "tags", None)
+    if tags is not None:
+        for field, keys in _TAG_KEYS.items():
+            result[field] = _first_tag_value(tags, keys)
 
     return {k: v for k, v in result.items() if v}
 
 
+def _first_tag_value(tags: object, keys: tuple[str, ...]) -> str:
+    for key in keys:
+        try:
+            value = _coerce_tag_value(tags.get(key))  # type: ignore[attr-defined]
+        except Exception:
+            # Vorbis comments reject non-ASCII keys such as MP4's "\xa9nam".
+            continue
+        if value:
+            return value
+    return ""
+
+
 def _coerce_tag_value(value: object) -> str:
     """Convert mutagen tag values into a usable string."""
     if value is None:
@@ -95,12 +136,24 @@ def _coerce_tag_value(value: object) -> str:
     return str(value).strip()
 
 
+_BPM_NUMERIC_RE = re.compile(r"\d+(?:[\.,]\d+)?")
+_WHITESPACE_RE = re.compile(r"\s+")
+_KEY_TAG_RE = re.compile(r"^\s*([A-Ga-g])\s*([#b♭♯]?)\s*(maj(?:or)?|min(?:or)?|m)?\s*$", re.IGNORECASE)
+_ARTIST_TITLE_RE = re.compile(r"^(?P<artist>.+?)\s*-\s*(?P<title>.+)$")
+
+# "A minor" -> "AMINOR" etc., so tag lookups are a single dict hit.
+_COMPACT_KEY_TO_CAMELOT: dict[str, str] = {
+    _WHITESPACE_RE.sub("", key_name).upper(): camelot for key_name, camelot in KEY_TO_CAMELOT.items()
+}
+
+
+@lru_cache(maxsize=4096)
 def parse_bpm_tag(value: str) -> float:
     """Parse BPM from metadata fields like '174', '174.0 BPM', etc."""
     if not value:
         return 0.0
 
-    match = re.search(r"\d+(?:[\.,]\d+)?", value)
+    match = _BPM_NUMERIC_RE.search(value)
     if not match:
         return 0.0
 
@@ -144,6 +197,7 @@ _NOTE_ALIAS_TO_CANONICAL: dict[str, str] = {
 }
 
 
+@lru_cache(maxsize=4096)
 def parse_key_tag_to_camelot(value: str) -> str:
     """Parse common key tag formats (e.g. 'Am', '8A', 'F# minor') into Camelot."""
     if not value:
@@ -155,16 +209,11 @@ def parse_key_tag_to_camelot(value: str) -> str:
         number, letter = parsed_camelot
         return f"{number}{letter}"
 
-    key_compact = re.sub(r"\s+", "", cleaned).upper()
-    for key_name, camelot in KEY_TO_CAMELOT.items():
-        if key_compact == re.sub(r"\s+", "", key_name).upper():
-            return camelot
+    camelot = _COMPACT_KEY_TO_CAMELOT.get(_WHITESPACE_RE.sub("", cleaned).upper())
+    if camelot:
+        return camelot
 
-    match = re.match(
-        r"^\s*([A-Ga-g])\s*([#b♭♯]?)\s*(maj(?:or)?|min(?:or)?|m)?\s*$",
-        cleaned,
-        re.IGNORECASE,
-    )
+    match = _KEY_TAG_RE.match(cleaned)
     if not match:
         return ""
 
@@ -184,11 +233,11 @@ def parse_key_tag_to_camelot(value: str) -> str:
 
 def parse_filename_metadata(path: Path) -> dict[str, str]:
     """Infer title/artist from filename when tags are missing."""
-    stem = re.sub(r"\s+", " ", path.stem).strip()
+    stem = _WHITESPACE_RE.sub(" ", path.stem).strip()
     if not stem:
         return {}
 
-    match = re.match(r"^(?P<artist>.+?)\s*-\s*(?P<title>.+)$", stem)
+    match = _ARTIST_TITLE_RE.match(stem)
     if match:
         artist = match.group("artist").strip()
         title = match.group("title").strip()
@@ -199,7 +248,7 @@ def parse_filename_metadata(path: Path) -> dict[str, str]:
 
 
 def read_duration(path: Path) -> float:
-    """Read duration from container metadata, with librosa fallback."""
+    """Read duration from container metadata, with soundfile/librosa fallbacks."""
     try:
         meta = mutagen.File(path)
         if meta is not None and getattr(meta, "info", None) is not None:
@@ -209,6 +258,15 @@ def read_duration(path: Path) -> float:
     except Exception:
         pass
 
+    # soundfile only parses the header for WAV/FLAC/OGG, so try it before librosa
+    # (which may go through an audioread decoder for the same answer).
+    try:
+        length = float(sf.info(str(path)).duration)
+        if length > 0:
+            return length
+    except Exception:
+        pass
+
     try:
         return float(librosa.get_duration(path=str(path)))
     except Exception:
@@ -218,84 +276,135 @@ def read_duration(path: Path) -> float:
 def _normalize_bpm(raw_bpm: float) -> float:
     """Normalize tempo to a practical DJ range while preserving feel."""
     bpm = float(raw_bpm)
-    if bpm <= 0:
+    if not math.isfinite(bpm) or bpm <= 0:
         return 0.0
 
-    while bpm < 70.0:
-        bpm *= 2.0
-    while bpm > 190.0:
-        bpm /= 2.0
+    # Fold by whole octaves in one step instead of doubling/halving in a loop;
+    # the trailing check absorbs log2 rounding right at the band edges.
+    if bpm < 70.0:
+        bpm = math.ldexp(bpm, math.ceil(math.log2(70.0 / bpm)))
+        if bpm < 70.0:
+            bpm *= 2.0
+    elif bpm > 190.0:
+        bpm = math.ldexp(bpm, -math.ceil(math.log2(bpm / 190.0)))
+        if bpm > 190.0:
+            bpm /= 2.0
     return bpm
 
 
 def _dedupe_tempos(candidates: list[float], tolerance: float = 0.75) -> list[float]:
+    """Drop invalid tempos and any tempo within tolerance of an already kept one.
+
+    Only kept values count, so a chain like 100 / 100.5 / 101.2 keeps 101.2.
+    """
     unique: list[float] = []
     for candidate in candidates:
-        if not np.isfinite(candidate) or candidate <= 0:
+        if not math.isfinite(candidate) or candidate <= 0:
             continue
         if any(abs(candidate - existing) <= tolerance for existing in unique):
             continue
-        unique.append(candidate)
+        unique.append(float(candidate))
     return unique
 
 
-def _tempo_periodicity_score(ac: np.ndarray, tempo: float, sr: int, hop_length: int) -> float:
-    if tempo <= 0:
+def _autocorrelate(values: np.ndarray, max_size: int) -> np.ndarray:
+    """Unnormalized autocorrelation via a zero-padded real FFT (power-of-two length)."""
+    n = values.shape[-1]
+    if n == 0 or max_size <= 0:
+        return np.zeros(0, dtype=values.dtype)
+    n_fft = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(values, n=n_fft)
+    power = spectrum.real**2 + spectrum.imag**2
+    return np.fft.irfft(power, n=n_fft)[: min(max_size, n)].astype(values.dtype, copy=False)
+
+
+def _onset_periodicity(onset_env: np.ndarray, sr: int, hop_length: int) -> float:
+    """Strongest normalized autocorrelation peak across the 55-220 BPM lag range."""
+    centered = onset_env - onset_env.mean()
+    frame_rate = sr / hop_length
+    min_lag = max(1, int(frame_rate * 60.0 / 220.0))
+    max_lag = int(frame_rate * 60.0 / 55.0)
+    ac = _autocorrelate(centered, max_size=max_lag + 1)
+    if ac.size <= min_lag or float(ac[0]) <= 1e-9:
         return 0.0
-
-    lag = int(round((60.0 * sr) / (hop_length * tempo)))
-    if lag <= 0 or lag >= len(ac):
-        return 0.0
-
-    score = float(ac[lag])
-    if lag * 2 < len(ac):
-        score += 0.5 * float(ac[lag * 2])
-    if lag * 3 < len(ac):
-        score += 0.25 * float(ac[lag * 3])
-    return score
-
-
-def _candidate_strength(candidates: list[tuple[float, float]], tempo: float, tolerance: float = 1.5) -> float:
-    """Get weighted support score for a tempo from nearby candidate bins."""
-    if tempo <= 0 or not candidates:
-        return 0.0
-
-    best = 0.0
-    for candidate_tempo, strength in candidates:
-        diff = abs(candidate_tempo - tempo)
-        if diff > tolerance:
-            continue
-        weight = 1.0 - (diff / max(tolerance, 1e-6))
-        best = max(best, strength * max(weight, 0.0))
+    return float(np.max(ac[min_lag:]) / ac[0])
+
+
+def _tempo_periodicity_scores(ac: np.ndarray, tempos: np.ndarray, sr: int, hop_length: int) -> np.ndarray:
+    """Autocorrelation support at each tempo's beat lag and its 2x/3x multiples."""
+    scores = np.zeros(tempos.shape, dtype=np.float64)
+    positive = tempos > 0
+    lags = np.zeros(tempos.shape, dtype=np.int64)
+    lags[positive] = np.rint((60.0 * sr) / (hop_length * tempos[positive]))
+    valid = positive & (lags > 0) & (lags < len(ac))
+
+    for multiple, weight in ((1, 1.0), (2, 0.5), (3, 0.25)):
+        idx = lags * multiple
+        hit = valid & (idx < len(ac))
+        scores[hit] += weight * ac[idx[hit]].astype(np.float64)
+    return scores
+
+
+def _candidate_strengths(
+    candidates: list[tuple[float, float]],
+    tempos: np.ndarray,
+    tolerance: float = 1.5,
+) -> np.ndarray:
+    """Get weighted support scores for tempos from nearby candidate bins."""
+    if not candidates:
+        return np.zeros(tempos.shape, dtype=np.float64)
+
+    bins = np.asarray(candidates, dtype=np.float64)
+    diff = np.abs(bins[None, :, 0] - tempos[:, None])
+    weight = np.maximum(1.0 - (diff / max(tolerance, 1e-6)), 0.0)
+    support = np.where(diff <= tolerance, bins[None, :, 1] * weight, 0.0)
+    best = np.maximum(support.max(axis=1), 0.0)
+    best[tempos <= 0] = 0.0
     return best
 
 
 def load_analysis_window(path: Path, duration: float) -> tuple[np.ndarray, int, float]:
-    """Load a representative slice to avoid intro/outro bias on long tracks."""
+    """Load a representative slice to avoid intro/outro bias on long tracks.
+
+    Audio is returned as float32; none of the downstream features need more precision.
+    """
     if duration <= 0:
-        y, sr = librosa.load(str(path), sr=22050, mono=True)
-        return y, sr, 0.0
+        y, sr = librosa.load(str(path), sr=22050, mono=True, dtype=np.float32)
+        return y.astype(np.float32, copy=False), sr, 0.0
 
     if duration < 180.0:
-        y, sr = librosa.load(str(path), sr=22050, mono=True)
-        return y, sr, 0.0
+        y, sr = librosa.load(str(path), sr=22050, mono=True, dtype=np.float32)
+        return y.astype(np.float32, copy=False), sr, 0.0
 
     window = min(120.0, duration * 0.4)
     offset = min(max(30.0, duration * 0.25), max(duration - window, 0.0))
-    y, sr = librosa.load(str(path), sr=22050, mono=True, offset=offset, duration=window)
-    return y, sr, offset
-
+    y, sr = librosa.load(str(path), sr=22050, mono=True, offset=offset, duration=window, dtype=np.float32)
+    return y.astype(np.float32, copy=False), sr, offset
+
+
+def detect_bpm(y: np.ndarray, sr: int, y_percussive: np.ndarray | None = None) -> float:
+    """Detect BPM from audio signal with robust half/double-time disambiguation.
+
+    A percussive component already separated by the caller is used directly as
+    the onset source instead of running HPSS again.
+    """
+    y = (y_percussive if y_percussive is not None else y).astype(np.float32, copy=False)
+    # Onsets live well below 5 kHz, so tempo work runs at half rate with the hop
+    # scaled to keep the ~43 Hz frame rate the candidate windows are tuned for.
+    if sr > _BPM_SR:
+        y = librosa.resample(y, orig_sr=sr, target_sr=_BPM_SR, res_type="polyphase")
+        sr = _BPM_SR
+    hop_length = max(1, int(round(512 * sr / 22050)))
+    n_fft = 4 * hop_length
+    onset_kwargs = {"sr": sr, "hop_length": hop_length, "n_fft": n_fft, "aggregate": np.median}
+    onset_env = librosa.onset.onset_strength(y=y, **onset_kwargs)
+    # HPSS only helps when pads/harmonics smear the onsets; when the raw envelope
+    # already shows a clear beat periodicity, skip the separation entirely.
+    if y_percussive is None and _onset_periodicity(onset_env, sr, hop_length) < _HPSS_SKIP_PERIODICITY:
+        _, source = separate_sources(y)
+        if source is not y:
+            onset_env = librosa.onset.onset_strength(y=source, **onset_kwargs)
 
-def detect_bpm(y: np.ndarray, sr: int) -> float:
-    """Detect BPM from audio signal with robust half/double-time disambiguation."""
-    hop_length = 512
-    try:
-        _, y_percussive = librosa.effects.hpss(y)
-        source = y_percussive if float(np.max(np.abs(y_percussive))) > 1e-6 else y
-    except Exception:
-        source = y
-
-    onset_env = librosa.onset.onset_strength(y=source, sr=sr, hop_length=hop_length, aggregate=np.median)
     if onset_env.size < 8 or float(np.max(onset_env)) <= 1e-6:
         return 0.0
     onset_norm = onset_env / (float(np.max(onset_env)) + 1e-9)
@@ -309,16 +418,28 @@ def detect_bpm(y: np.ndarray, sr: int) -> float:
     )
     beat_value = float(np.atleast_1d(beat_tempo)[0])
 
-    tempo_feature = librosa.feature.tempo(
+    # Both tempo summaries share one tempogram instead of librosa recomputing it
+    # inside every feature.tempo call. It uses the same 8 s window feature.tempo
+    # builds internally (ac_size=8.0), which differs from the default window of
+    # the candidate tempogram further down.
+    tempo_window = int(librosa.time_to_frames(8.0, sr=sr, hop_length=hop_length))
+    tempo_tg = librosa.feature.tempogram(
         onset_envelope=onset_norm,
         sr=sr,
         hop_length=hop_length,
+        win_length=tempo_window,
+    )
+
+    tempo_feature = librosa.feature.tempo(
+        tg=tempo_tg,
+        sr=sr,
+        hop_length=hop_length,
         aggregate=np.median,
     )
     feature_value = float(np.atleast_1d(tempo_feature)[0]) if np.size(tempo_feature) else 0.0
 
     dynamic_tempi = librosa.feature.tempo(
-        onset_envelope=onset_norm,
+        tg=tempo_tg,
         sr=sr,
         hop_length=hop_length,
         aggregate=None,
@@ -327,10 +448,7 @@ def detect_bpm(y: np.ndarray, sr: int) -> float:
     dynamic_candidates = dynamic_candidates[(dynamic_candidates >= 55.0) & (dynamic_candidates <= 220.0)]
     dynamic_value = float(np.median(dynamic_candidates)) if dynamic_candidates.size else 0.0
 
-    ac = librosa.autocorrelate(
-        onset_norm,
-        max_size=min(len(onset_env), int((sr / hop_length) * 8.0)),
-    )
+    ac = _autocorrelate(onset_norm, max_size=min(len(onset_env), int((sr / hop_length) * 8.0)))
     if ac.size > 0:
         ac[0] = 0.0
 
@@ -374,29 +492,23 @@ def detect_bpm(y: np.ndarray, sr: int) -> float:
     if not candidates:
         return round(_normalize_bpm(max(beat_value, feature_value, dynamic_value, 0.0)), 1)
 
-    def score_candidate(tempo: float) -> float:
-        score = _tempo_periodicity_score(ac, tempo, sr, hop_length)
-        score += 1.15 * _candidate_strength(tempogram_candidates, tempo, tolerance=1.5)
-        score += 0.8 * _candidate_strength(autocorr_candidates, tempo, tolerance=1.5)
+    def score_candidates(tempos: list[float]) -> np.ndarray:
+        tempo_arr = np.asarray(tempos, dtype=np.float64)
+        scores = _tempo_periodicity_scores(ac, tempo_arr, sr, hop_length)
+        scores += 1.15 * _candidate_strengths(tempogram_candidates, tempo_arr, tolerance=1.5)
+        scores += 0.8 * _candidate_strengths(autocorr_candidates, tempo_arr, tolerance=1.5)
 
         for reference, weight in ((beat_value, 0.30), (feature_value, 0.25), (dynamic_value, 0.20)):
             if reference <= 0:
                 continue
-            ratio = max(tempo, reference) / min(tempo, reference)
-            if ratio <= 1.05:
-                score += weight
-            elif abs(ratio - 2.0) <= 0.08:
-                score += weight * 0.45
+            ratio = np.maximum(tempo_arr, reference) / np.minimum(tempo_arr, reference)
+            scores += np.where(ratio <= 1.05, weight, np.where(np.abs(ratio - 2.0) <= 0.08, weight * 0.45, 0.0))
 
-        if 118.0 <= tempo <= 180.0:
-            score *= 1.03
-        return float(score)
+        return np.where((tempo_arr >= 118.0) & (tempo_arr <= 180.0), scores * 1.03, scores)
 
-    scored: list[tuple[float, float]] = []
-    for tempo in candidates:
-        scored.append((tempo, score_candidate(tempo)))
-
-    best_tempo, best_score = max(scored, key=lambda item: item[1])
+    scores = score_candidates(candidates)
+    best_idx = int(np.argmax(scores))
+    best_tempo, best_score = candidates[best_idx], float(scores[best_idx])
 
     # Refine with half/double variants around the best candidate.
     variants = [best_tempo]
@@ -405,13 +517,15 @@ def detect_bpm(y: np.ndarray, sr: int) -> float:
     if best_tempo * 2.0 <= 210.0:
         variants.append(best_tempo * 2.0)
 
-    variant_scores = [(tempo, score_candidate(tempo)) for tempo in _dedupe_tempos(variants, tolerance=0.1)]
-    best_tempo, best_score = max(variant_scores, key=lambda item: item[1])
+    variant_tempos = _dedupe_tempos(variants, tolerance=0.1)
+    variant_scores = score_candidates(variant_tempos)
+    best_idx = int(np.argmax(variant_scores))
+    best_tempo, best_score = variant_tempos[best_idx], float(variant_scores[best_idx])
 
     # DnB and similar styles are commonly tagged in double-time.
     if best_tempo < 100.0 and best_tempo * 2.0 <= 210.0:
         doubled = best_tempo * 2.0
-        doubled_score = score_candidate(doubled)
+        doubled_score = float(score_candidates([doubled])[0])
         high_reference = max(beat_value, feature_value, dynamic_value)
         if high_reference >= 120.0 and doubled_score >= best_score * 0.90:
             best_tempo = doubled
@@ -419,28 +533,74 @@ def detect_bpm(y: np.ndarray, sr: int) -> float:
     return round(_normalize_bpm(best_tempo), 1)
 
 
-def detect_key(y: np.ndarray, sr: int) -> str:
-    """Detect musical key and return Camelot notation."""
-    if y.size == 0:
-        return ""
+def separate_sources(y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Harmonic and percussive components of y.
 
+    Each component falls back to y itself if HPSS fails or leaves it silent.
+    """
     try:
-        y_harmonic, _ = librosa.effects.hpss(y)
-        source = y_harmonic if float(np.max(np.abs(y_harmonic))) > 1e-6 else y
+        y_harmonic, y_percussive = librosa.effects.hpss(y)
     except Exception:
-        source = y
+        return y, y
+    return (
+        y_harmonic if float(np.max(np.abs(y_harmonic))) > 1e-6 else y,
+        y_percussive if float(np.max(np.abs(y_percussive))) > 1e-6 else y,
+    )
+
 
+def estimate_tuning(y: np.ndarray, sr: int) -> float:
+    """Tuning offset in fractions of a chroma bin, 0.0 when it cannot be estimated."""
     try:
-        tuning = float(librosa.estimate_tuning(y=source, sr=sr))
+        with warnings.catch_warnings():
+            # Silent or pitchless input warns about an empty frequency set and yields 0.
+            warnings.simplefilter("ignore", UserWarning)
+            return float(librosa.estimate_tuning(y=y, sr=sr))
     except Exception:
-        tuning = 0.0
+        return 0.0
 
-    chroma_cqt = librosa.feature.chroma_cqt(y=source, sr=sr, tuning=tuning)
-    chroma_stft = librosa.feature.chroma_stft(y=source, sr=sr, tuning=tuning)
-    chroma = 0.7 * chroma_cqt + 0.3 * chroma_stft
-    chroma = librosa.util.normalize(chroma + 1e-9, axis=0)
+
+def detect_key(
+    y: np.ndarray,
+    sr: int,
+    y_harmonic: np.ndarray | None = None,
+    tuning: float | None = None,
+) -> str:
+    """Detect musical key and return Camelot notation.
+
+    Callers that already separated the harmonic component or estimated tuning
+    (see analyze_track) can pass them in to skip recomputing either.
+    """
+    if y.size == 0:
+        return ""
+    y = y.astype(np.float32, copy=False)
+
+    source = y_harmonic if y_harmonic is not None else separate_sources(y)[0]
+    if tuning is None:
+        tuning = estimate_tuning(source, sr)
 
     rms = librosa.feature.rms(y=source)[0]
+    chroma_cqt = librosa.feature.chroma_cqt(y=source, sr=sr, tuning=tuning)
+    correlations = _key_correlations(chroma_cqt, rms)
+
+    # The STFT chroma only tips close calls, so compute it when the best two
+    # candidate keys are within 10% of each other.
+    second, best = np.partition(correlations.ravel(), -2)[-2:]
+    if best - second <= 0.1 * abs(best):
+        chroma_stft = librosa.feature.chroma_stft(y=source, sr=sr, tuning=tuning)
+        if chroma_stft.shape == chroma_cqt.shape:
+            correlations = _key_correlations(0.7 * chroma_cqt + 0.3 * chroma_stft, rms)
+
+    # Rows are roots and columns are (major, minor), so argmax keeps the
+    # original major-then-minor scan order on ties.
+    root, mode = divmod(int(np.argmax(correlations)), 2)
+    best_key = CHROMA_MAJOR[root] if mode == 0 else CHROMA_MINOR[root]
+
+    return key_name_to_camelot(best_key)
+
+
+def _key_correlations(chroma: np.ndarray, rms: np.ndarray) -> np.ndarray:
+    """Average loud frames of a chromagram and correlate it against the key profiles."""
+    chroma = librosa.util.normalize(chroma + 1e-9, axis=0)
     if rms.size == chroma.shape[1]:
         threshold = float(np.percentile(rms, 30))
         mask = rms >= threshold
@@ -449,39 +609,35 @@ def detect_key(y: np.ndarray, sr: int) -> str:
         chroma_avg = np.mean(chroma, axis=1)
 
     chroma_avg = chroma_avg / (np.sum(chroma_avg) + 1e-9)
+    return _rotation_correlations(chroma_avg, _KEY_PROFILES_Z)
 
-    # Krumhansl-Kessler key profiles
-    major_profile = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
-    minor_profile = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
 
-    best_corr = -1.0
-    best_key = ""
+def _zscore_rows(values: np.ndarray) -> np.ndarray:
+    centered = values - values.mean(axis=-1, keepdims=True)
+    std = centered.std(axis=-1, keepdims=True)
+    return np.divide(centered, std, out=np.zeros_like(centered), where=std >= 1e-9)
 
-    for i in range(12):
-        # Rotate chroma to test each root
-        rotated = np.roll(chroma_avg, -i)
-        major_corr = _safe_corr(rotated, major_profile)
-        minor_corr = _safe_corr(rotated, minor_profile)
 
-        if major_corr > best_corr:
-            best_corr = major_corr
-            best_key = CHROMA_MAJOR[i]
-        if minor_corr > best_corr:
-            best_corr = minor_corr
-            best_key = CHROMA_MINOR[i]
+def _rotation_correlations(chroma: np.ndarray, profiles_z: np.ndarray) -> np.ndarray:
+    """Pearson correlation of every chroma rotation against z-scored profiles.
 
-    return key_name_to_camelot(best_key)
+    Returns an array of shape (12, n_profiles); zero-variance chroma correlates as 0.
+    """
+    if chroma.size == 0:
+        return np.zeros((12, profiles_z.shape[0]))
+    rotations = chroma[(np.arange(12)[:, None] + np.arange(12)[None, :]) % 12]
+    correlations = _zscore_rows(rotations) @ profiles_z.T / rotations.shape[1]
+    return np.nan_to_num(correlations, nan=0.0, posinf=0.0, neginf=0.0)
 
 
-def _safe_corr(a: np.ndarray, b: np.ndarray) -> float:
-    if a.size == 0 or b.size == 0:
-        return 0.0
-    if float(np.std(a)) < 1e-9 or float(np.std(b)) < 1e-9:
-        return 0.0
-    value = float(np.corrcoef(a, b)[0, 1])
-    if not np.isfinite(value):
-        return 0.0
-    return value
+# Krumhansl-Kessler key profiles (major, minor), z-scored once at import.
+_KEY_PROFILES = np.array(
+    [
+        [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88],
+        [6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17],
+    ]
+)
+_KEY_PROFILES_Z = _zscore_rows(_KEY_PROFILES).astype(np.float32)
 
 
 def detect_energy(y: np.ndarray, sr: int) -> float:
@@ -506,11 +662,11 @@ def detect_energy_with_confidence(y: np.ndarray, sr: int) -> tuple[float, float]
     spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
 
     # Normalize RMS (typical range for music)
-    rms_mean = float(np.mean(rms))
+    rms_mean = float(rms.mean())
     rms_score = min(rms_mean / 0.15, 1.0)
 
     # Normalize spectral centroid (higher = brighter = more energy)
-    centroid_mean = float(np.mean(spectral_centroid))
+    centroid_mean = float(spectral_centroid.mean())
     centroid_score = min(centroid_mean / 5000.0, 1.0)
 
     # Weighted combination
@@ -518,12 +674,17 @@ def detect_energy_with_confidence(y: np.ndarray, sr: int) -> tuple[float, float]
     energy = round(min(max(energy, 0.0), 1.0), 2)
 
     # Confidence focuses on the quality of the energy estimate only.
-    dynamic_range = float(np.percentile(rms, 95) - np.percentile(rms, 5)) if rms.size > 0 else 0.0
-    rms_std = float(np.std(rms)) if rms.size > 0 else 0.0
+    if rms.size > 0:
+        p5, p95 = np.percentile(rms, [5, 95])
+        dynamic_range = float(p95 - p5)
+        rms_std = float(rms.std())
+        silence_ratio = float(np.count_nonzero(rms < max(rms_mean * 0.35, 1e-6))) / rms.size
+    else:
+        dynamic_range = rms_std = 0.0
+        silence_ratio = 1.0
     variance_ratio = rms_std / (rms_mean + 1e-6)
-    centroid_std = float(np.std(spectral_centroid)) if spectral_centroid.size > 0 else 0.0
+    centroid_std = float(spectral_centroid.std()) if spectral_centroid.size > 0 else 0.0
     centroid_ratio = centroid_std / (centroid_mean + 1e-6)
-    silence_ratio = float(np.mean(rms < max(rms_mean * 0.35, 1e-6))) if rms.size > 0 else 1.0
 
     dynamic_score = min(dynamic_range / 0.12, 1.0)
     variance_score = min(variance_ratio / 0.8, 1.0)
@@ -611,6 +772,7 @@ def classify_review_flags(
 def analyze_track(path: Path) -> Track:
     """Full analysis of a single audio track. Returns a Track model."""
     fhash = file_hash(path)
+    file_size, file_mtime_ns = file_stat(path)
     metadata = read_metadata(path)
     filename_meta = parse_filename_metadata(path)
     duration = read_duration(path)
@@ -623,8 +785,17 @@ def analyze_track(path: Path) -> Track:
     metadata_bpm = parse_bpm_tag(metadata.get("bpm", ""))
     metadata_key = parse_key_tag_to_camelot(metadata.get("key", ""))
 
-    bpm = metadata_bpm if metadata_bpm > 0 else detect_bpm(y, sr)
-    musical_key = metadata_key or detect_key(y, sr)
+    # Key detection needs HPSS regardless, so run it once here and hand the
+    # percussive half to BPM detection as well.
+    y_harmonic = y_percussive = None
+    if not metadata_key:
+        y_harmonic, y_percussive = separate_sources(y)
+
+    bpm = metadata_bpm if metadata_bpm > 0 else detect_bpm(y, sr, y_percussive=y_percussive)
+
+    musical_key = metadata_key
+    if not musical_key:
+        musical_key = detect_key(y, sr, y_harmonic=y_harmonic, tuning=estimate_tuning(y_harmonic, sr))
     energy, energy_confidence = detect_energy_with_confidence(y, sr)
     preview_start = detect_preview_start(
         y=y,
@@ -665,4 +836,71 @@ def analyze_track(path: Path) -> Track:
         needs_review=needs_review,
         review_notes=review_notes,
         analysis_version=ANALYSIS_VERSION,
+        file_size=file_size,
+        file_mtime_ns=file_mtime_ns,
     )
+
+
+# Each worker analyzes one file at a time, so native thread pools are kept
+# single-threaded to avoid workers x cores oversubscription.
+_WORKER_THREAD_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMBA_NUM_THREADS")
+
+
+@contextmanager
+def _single_threaded_children() -> Iterator[None]:
+    """Set the thread-count variables while worker processes are spawned.
+
+    BLAS sizes its pool when numpy is first imported, which for a spawned
+    child happens while unpickling its first task, before any initializer
+    could run. Children inherit the parent's environment instead, so the
+    variables are set here and restored once the workers exist.
+    """
+    saved = {var: os.environ.get(var) for var in _WORKER_THREAD_VARS}
+    os.environ.update(dict.fromkeys(_WORKER_THREAD_VARS, "1"))
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def analyze_tracks(
+    paths: Sequence[Path],
+    workers: int | None = None,
+) -> Iterator[tuple[Path, Track | Exception]]:
+    """Analyze many tracks in parallel worker processes.
+
+    Yields (path, result) pairs in completion order, where result is the Track or
+    the exception raised for that file. A single worker runs in-process.
+    """
+    paths = list(paths)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+
+    if workers == 1:
+        for path in paths:
+            try:
+                yield path, analyze_track(path)
+            except Exception as exc:
+                yield path, exc
+        return
+
+    # Spawned workers avoid inheriting Qt/audio state from a forked GUI process.
+    # They are started on demand by submit(), so every submit happens while the
+    # environment is pinned.
+    executor = None
+    try:
+        with _single_threaded_children():
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            futures = {executor.submit(analyze_track, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                yield path, future.result()
+            except Exception as exc:
+                yield path, exc
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -55,6 +55,40 @@ def parse_camelot(camelot: str) -> tuple[int, str] | None:
     return (number, letter)
 
 
+def _wheel_neighbours(number: int, letter: str) -> tuple[str, str, str, str]:
+    up = (number % 12) + 1
+    down = ((number - 2) % 12) + 1
+    other = "B" if letter == "A" else "A"
+    return (f"{number}{letter}", f"{up}{letter}", f"{down}{letter}", f"{number}{other}")
+
+
+def _pair_score(key_a: tuple[int, str], key_b: tuple[int, str]) -> float:
+    if key_a == key_b:
+        return 1.0
+    if f"{key_b[0]}{key_b[1]}" in _wheel_neighbours(*key_a):
+        return 0.8
+    dist = min(abs(key_a[0] - key_b[0]), 12 - abs(key_a[0] - key_b[0]))
+    if dist == 2 and key_a[1] == key_b[1]:
+        return 0.5
+    return 0.2
+
+
+# There are only 24 Camelot keys, so neighbours and pairwise scores are tabulated
+# once at import and the public helpers reduce to dict lookups.
+_CAMELOT_KEYS: tuple[tuple[int, str], ...] = tuple((n, letter) for n in range(1, 13) for letter in ("A", "B"))
+_COMPATIBLE_KEYS: dict[str, tuple[str, str, str, str]] = {
+    f"{n}{letter}": _wheel_neighbours(n, letter) for n, letter in _CAMELOT_KEYS
+}
+_COMPATIBILITY_SCORES: dict[tuple[str, str], float] = {
+    (f"{a[0]}{a[1]}", f"{b[0]}{b[1]}"): _pair_score(a, b) for a in _CAMELOT_KEYS for b in _CAMELOT_KEYS
+}
+
+
+def _canonical_camelot(camelot: str) -> str:
+    parsed = parse_camelot(camelot)
+    return f"{parsed[0]}{parsed[1]}" if parsed is not None else ""
+
+
 def compatible_keys(camelot: str) -> list[str]:
     """Return list of Camelot keys that are harmonically compatible.
 
@@ -64,24 +98,10 @@ def compatible_keys(camelot: str) -> list[str]:
     - -1 semitone on wheel (e.g. 8A → 7A)
     - Relative major/minor (e.g. 8A → 8B)
     """
-    parsed = parse_camelot(camelot)
-    if parsed is None:
-        return []
-
-    number, letter = parsed
-    results = [f"{number}{letter}"]  # same key
-
-    # Adjacent on wheel
-    up = (number % 12) + 1
-    down = ((number - 2) % 12) + 1
-    results.append(f"{up}{letter}")
-    results.append(f"{down}{letter}")
-
-    # Relative major/minor switch
-    other = "B" if letter == "A" else "A"
-    results.append(f"{number}{other}")
-
-    return results
+    compat = _COMPATIBLE_KEYS.get(camelot.upper())
+    if compat is None:
+        compat = _COMPATIBLE_KEYS.get(_canonical_camelot(camelot), ())
+    return list(compat)
 
 
 def key_compatibility_score(key_a: str, key_b: str) -> float:
@@ -95,22 +115,8 @@ def key_compatibility_score(key_a: str, key_b: str) -> float:
     if not key_a or not key_b:
         return 0.5  # unknown key, neutral score
 
-    parsed_a = parse_camelot(key_a)
-    parsed_b = parse_camelot(key_b)
-    if parsed_a is None or parsed_b is None:
-        return 0.5
-
-    if key_a.upper() == key_b.upper():
-        return 1.0
-
-    if key_b.upper() in [k.upper() for k in compatible_keys(key_a)]:
-        return 0.8
-
-    # Two steps away on wheel
-    num_a, let_a = parsed_a
-    num_b, let_b = parsed_b
-    dist = min(abs(num_a - num_b), 12 - abs(num_a - num_b))
-    if dist == 2 and let_a == let_b:
-        return 0.5
-
-    return 0.2  # far away
+    score = _COMPATIBILITY_SCORES.get((key_a.upper(), key_b.upper()))
+    if score is None:
+        # Non-canonical spellings (" 8a", "08A"); anything unparsable stays neutral.
+        score = _COMPATIBILITY_SCORES.get((_canonical_camelot(key_a), _canonical_camelot(key_b)), 0.5)
+    return score
@@ -1,20 +1,89 @@
 """Find audio files in directories."""
 
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
-AUDIO_EXTENSIONS = {
+AUDIO_EXTENSIONS = frozenset({
     ".mp3", ".flac", ".wav", ".aiff", ".aif", ".m4a", ".ogg", ".opus", ".wma",
-}
+})
+# Extensions without the dot, for matching the tail of ``name.rpartition(".")``.
+_AUDIO_SUFFIXES = frozenset(ext[1:] for ext in AUDIO_EXTENSIONS)
 
+# Walking is dominated by directory syscalls, so it's only worth fanning out to
+# threads when the root has enough subdirectories to keep them busy.
+_PARALLEL_MIN_SUBDIRS = 4
 
-def find_audio_files(directory: str | Path) -> list[Path]:
-    """Recursively find all audio files in a directory."""
+
+def find_audio_files(directory: str | Path, sort: bool = False) -> list[Path]:
+    """Recursively find all audio files in a directory.
+
+    Files come back in walk order unless ``sort`` is set.
+    """
     root = Path(directory).expanduser().resolve()
     if not root.is_dir():
         raise FileNotFoundError(f"Directory not found: {root}")
 
-    files = []
-    for path in sorted(root.rglob("*")):
-        if path.is_file() and path.suffix.lower() in AUDIO_EXTENSIONS:
-            files.append(path)
+    subdirs, files = _scan_dir(str(root))
+    if len(subdirs) > _PARALLEL_MIN_SUBDIRS:
+        files.extend(_walk_parallel(subdirs))
+    else:
+        stack = subdirs
+        while stack:
+            found_dirs, found = _scan_dir(stack.pop())
+            stack.extend(found_dirs)
+            files.extend(found)
+    if sort:
+        files.sort()
+    return files
+
+
+def _walk_parallel(directories: list[str]) -> list[Path]:
+    """Walk several directory trees on a thread pool, one directory per task."""
+    files: list[Path] = []
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_scan_dir, d) for d in directories}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                subdirs, found = future.result()
+                files.extend(found)
+                pending.update(pool.submit(_scan_dir, d) for d in subdirs)
     return files
+
+
+def _scan_dir(directory: str) -> tuple[list[str], list[Path]]:
+    """List one directory, returning its subdirectories and audio files.
+
+    Uses the type information ``scandir`` already has instead of stat'ing each
+    path again. Symlinked directories aren't descended into (matching ``rglob``),
+    but symlinked files are still picked up.
+    """
+    subdirs: list[str] = []
+    files: list[Path] = []
+    try:
+        it = os.scandir(directory)
+    except OSError:
+        return subdirs, files
+
+    with it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
+                is_file = entry.is_file()
+            except OSError:
+                continue
+            if is_file and _is_audio_name(entry.name):
+                files.append(Path(entry.path))
+    return subdirs, files
+
+
+def _is_audio_name(name: str) -> bool:
+    stem, dot, ext = name.rpartition(".")
+    if not dot or not stem:
+        return False
+    # Most names are already lowercase; only allocate a lowered copy when not.
+    return ext in _AUDIO_SUFFIXES or ext.lower() in _AUDIO_SUFFIXES
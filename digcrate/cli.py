@@ -5,8 +5,6 @@ from typing import Optional
 
 import typer
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
-from rich.table import Table
 
 app = typer.Typer(
     name="digcrate",
@@ -19,11 +17,16 @@ console = Console()
 @app.command()
 def scan(
     directory: str = typer.Argument(..., help="Directory to scan for audio files"),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="Parallel analysis processes (default: CPU count)"
+    ),
 ):
     """Analyze all audio tracks in a directory."""
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+
     from digcrate.analysis.scanner import find_audio_files
-    from digcrate.analysis.analyzer import analyze_track, file_hash
-    from digcrate.db import get_track_by_path, upsert_track
+    from digcrate.analysis.analyzer import analyze_tracks, file_hash, file_stat
+    from digcrate.db import get_tracks_by_paths, refresh_planner_stats, set_track_file_stat, upsert_tracks
 
     dir_path = Path(directory).expanduser().resolve()
     if not dir_path.is_dir():
@@ -31,7 +34,7 @@ def scan(
         raise typer.Exit(1)
 
     console.print(f"Scanning [bold]{dir_path}[/bold] for audio files...")
-    files = find_audio_files(dir_path)
+    files = find_audio_files(dir_path, sort=False)
 
     if not files:
         console.print("[yellow]No audio files found.[/yellow]")
@@ -42,6 +45,9 @@ def scan(
     analyzed = 0
     skipped = 0
     errors = 0
+    # Analyzed tracks are written in batches so a large scan commits once per
+    # batch rather than once per file.
+    pending = []
 
     with Progress(
         SpinnerColumn(),
@@ -52,27 +58,46 @@ def scan(
     ) as progress:
         task = progress.add_task("Analyzing tracks", total=len(files))
 
+        existing_by_path = get_tracks_by_paths(str(p) for p in files)
+        to_analyze = []
         for audio_file in files:
+            # Skip if already analyzed and unchanged: an identical size/mtime avoids
+            # reading the file at all, otherwise the content hash decides.
+            existing = existing_by_path.get(str(audio_file))
+            if existing and (existing.title or "").strip():
+                size, mtime_ns = file_stat(audio_file)
+                unchanged = bool(mtime_ns) and (existing.file_size, existing.file_mtime_ns) == (size, mtime_ns)
+                if not unchanged and existing.file_hash == file_hash(audio_file):
+                    set_track_file_stat(existing.id, size, mtime_ns)
+                    unchanged = True
+                if unchanged:
+                    skipped += 1
+                    progress.advance(task)
+                    continue
+            to_analyze.append(audio_file)
+
+        # Analysis runs in worker processes; results are written from this thread
+        # so there is only ever one SQLite writer.
+        for audio_file, result in analyze_tracks(to_analyze, workers=jobs):
             progress.update(task, description=f"[dim]{audio_file.name}[/dim]")
-
-            # Skip if already analyzed with same hash
-            existing = get_track_by_path(str(audio_file))
-            current_hash = file_hash(audio_file)
-            if existing and existing.file_hash == current_hash and (existing.title or "").strip():
-                skipped += 1
-                progress.advance(task)
-                continue
-
-            try:
-                track = analyze_track(audio_file)
-                upsert_track(track)
-                analyzed += 1
-            except Exception as e:
-                console.print(f"\n[red]Error analyzing {audio_file.name}:[/red] {e}")
+            if isinstance(result, Exception):
+                console.print(f"\n[red]Error analyzing {audio_file.name}:[/red] {result}")
                 errors += 1
+            else:
+                pending.append(result)
+                analyzed += 1
 
+            if len(pending) >= 64:
+                upsert_tracks(pending)
+                pending.clear()
             progress.advance(task)
 
+        if pending:
+            upsert_tracks(pending)
+
+    if analyzed:
+        refresh_planner_stats()
+
     console.print()
     console.print(f"[green]Done![/green] Analyzed: {analyzed} | Cached: {skipped} | Errors: {errors}")
 
@@ -80,46 +105,41 @@ def scan(
 @app.command()
 def stats():
     """Show library overview statistics."""
-    from digcrate.db import get_all_tracks
+    from rich.table import Table
 
-    tracks = get_all_tracks()
-    if not tracks:
+    from digcrate.db import key_histogram, library_stats
+
+    summary = library_stats()
+    if not summary["track_count"]:
         console.print("[yellow]No tracks in library. Run 'digcrate scan' first.[/yellow]")
         raise typer.Exit(0)
 
-    bpms = [t.bpm for t in tracks if t.bpm > 0]
-    energies = [t.energy_level for t in tracks if t.energy_level > 0]
-    keys = {}
-    for t in tracks:
-        if t.musical_key:
-            keys[t.musical_key] = keys.get(t.musical_key, 0) + 1
-
     table = Table(title="Library Stats")
     table.add_column("Metric", style="bold")
     table.add_column("Value")
 
-    table.add_row("Total tracks", str(len(tracks)))
-    if bpms:
-        table.add_row("BPM range", f"{min(bpms):.0f} - {max(bpms):.0f}")
-        table.add_row("Average BPM", f"{sum(bpms)/len(bpms):.1f}")
-    if energies:
-        table.add_row("Energy range", f"{min(energies):.2f} - {max(energies):.2f}")
-        table.add_row("Average energy", f"{sum(energies)/len(energies):.2f}")
+    table.add_row("Total tracks", str(summary["track_count"]))
+    if summary["avg_bpm"] is not None:
+        table.add_row("BPM range", f"{summary['min_bpm']:.0f} - {summary['max_bpm']:.0f}")
+        table.add_row("Average BPM", f"{summary['avg_bpm']:.1f}")
+    if summary["avg_energy"] is not None:
+        table.add_row("Energy range", f"{summary['min_energy']:.2f} - {summary['max_energy']:.2f}")
+        table.add_row("Average energy", f"{summary['avg_energy']:.2f}")
 
-    total_duration = sum(t.duration for t in tracks)
+    total_duration = summary["total_duration"]
     hours = int(total_duration // 3600)
     minutes = int((total_duration % 3600) // 60)
     table.add_row("Total duration", f"{hours}h {minutes}m")
 
     console.print(table)
 
-    if keys:
+    top_keys = key_histogram(10)
+    if top_keys:
         console.print()
-        sorted_keys = sorted(keys.items(), key=lambda x: -x[1])[:10]
         key_table = Table(title="Top Keys")
         key_table.add_column("Key")
         key_table.add_column("Count")
-        for k, count in sorted_keys:
+        for k, count in top_keys:
             key_table.add_row(k, str(count))
         console.print(key_table)
 
@@ -127,11 +147,13 @@ def stats():
 @app.command()
 def search(
     bpm: Optional[str] = typer.Option(None, help="BPM range, e.g. '170-175'"),
-    key: Optional[str] = typer.Option(None, help="Camelot key, e.g. '8A'"),
+    key: Optional[str] = typer.Option(None, help="Camelot key(s), e.g. '8A' or '8A,9A'"),
     energy: Optional[str] = typer.Option(None, help="Energy range, e.g. '0.5-0.8'"),
     query: Optional[str] = typer.Option(None, "-q", help="Search artist/title"),
 ):
     """Search your track library."""
+    from rich.table import Table
+
     from digcrate.db import search_tracks as db_search
 
     bpm_min, bpm_max = None, None
@@ -146,9 +168,11 @@ def search(
         energy_min = float(parts[0])
         energy_max = float(parts[1]) if len(parts) > 1 else energy_min + 0.1
 
+    keys = [k.strip().upper() for k in key.split(",") if k.strip()] if key else None
+
     tracks = db_search(
         bpm_min=bpm_min, bpm_max=bpm_max,
-        key=key, energy_min=energy_min, energy_max=energy_max,
+        key=keys, energy_min=energy_min, energy_max=energy_max,
         query=query,
     )
 
@@ -197,7 +221,9 @@ def show(
     name: str = typer.Argument(..., help="Name of the set to display"),
 ):
     """View a planned set with transition scores."""
-    from digcrate.db import get_set_by_name, get_set_tracks, get_track_by_id
+    from rich.table import Table
+
+    from digcrate.db import get_set_by_name, get_set_tracks_with_tracks
     from digcrate.planning.scoring import describe_transition
 
     set_plan = get_set_by_name(name)
@@ -205,7 +231,7 @@ def show(
         console.print(f"[red]Error:[/red] Set '{name}' not found.")
         raise typer.Exit(1)
 
-    set_tracks = get_set_tracks(set_plan.id)
+    set_tracks = get_set_tracks_with_tracks(set_plan.id)
     if not set_tracks:
         console.print(f"[yellow]Set '{name}' has no tracks.[/yellow]")
         raise typer.Exit(0)
@@ -225,11 +251,7 @@ def show(
     table.add_column("Transition", justify="center")
 
     total_duration = 0.0
-    for st in set_tracks:
-        track = get_track_by_id(st.track_id)
-        if not track:
-            continue
-
+    for st, track in set_tracks:
         total_duration += track.duration
 
         trans = ""
@@ -290,6 +312,8 @@ def discover(
     limit: int = typer.Option(10, help="Max results"),
 ):
     """Find tracks on Spotify to fill a gap in your set."""
+    from rich.table import Table
+
     from digcrate.db import get_gaps, get_set_by_name
     from digcrate.discovery.spotify import search_tracks as spotify_search
 
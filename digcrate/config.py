@@ -1,5 +1,6 @@
 """Configuration loaded from .env file."""
 
+from functools import lru_cache
 from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -21,5 +22,11 @@ class Settings(BaseSettings):
         return Path(self.database_path)
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    """Return the process-wide settings, parsed from the environment and .env once.
+
+    Call ``get_settings.cache_clear()`` after changing either so the next call
+    picks the new values up.
+    """
     return Settings()
@@ -1,12 +1,22 @@
 """SQLite database schema and queries."""
 
-import asyncio
+import atexit
+import re
 import sqlite3
+import sys
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 from digcrate.config import get_settings
 from digcrate.models import Gap, SetPlan, SetTrack, Track
 
+# Stored in PRAGMA user_version. Bump it whenever SCHEMA, MIGRATED_INDEXES, FTS_SCHEMA or the
+# column migrations change so existing databases get migrated on next open.
+SCHEMA_VERSION = 3
+
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS tracks (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -23,7 +33,9 @@ CREATE TABLE IF NOT EXISTS tracks (
     needs_review INTEGER DEFAULT 0,
     review_notes TEXT DEFAULT '',
     has_overrides INTEGER DEFAULT 0,
-    analysis_version INTEGER DEFAULT 3
+    analysis_version INTEGER DEFAULT 3,
+    file_size INTEGER DEFAULT 0,
+    file_mtime_ns INTEGER DEFAULT 0
 );
 
 CREATE TABLE IF NOT EXISTS sets (
@@ -61,22 +73,232 @@ CREATE TABLE IF NOT EXISTS track_overrides (
     energy_level REAL,
     updated_at TEXT DEFAULT CURRENT_TIMESTAMP
 );
+
+CREATE INDEX IF NOT EXISTS idx_tracks_hash ON tracks(file_hash);
+CREATE INDEX IF NOT EXISTS idx_tracks_bpm ON tracks(bpm);
+CREATE INDEX IF NOT EXISTS idx_tracks_key ON tracks(musical_key);
+CREATE INDEX IF NOT EXISTS idx_tracks_energy ON tracks(energy_level);
+CREATE INDEX IF NOT EXISTS idx_set_tracks_track ON set_tracks(track_id);
+"""
+
+# Indexes over columns that older databases only gain in _ensure_track_columns,
+# so they are created after that migration rather than in SCHEMA.
+MIGRATED_INDEXES = """
+-- Matches search_tracks' ORDER BY so unfiltered searches need no sort step.
+CREATE INDEX IF NOT EXISTS idx_tracks_review ON tracks(needs_review DESC, energy_confidence, bpm);
+"""
+
+
+# Running library totals and per-key counts for library_stats()/key_histogram(),
+# kept current by triggers so reading them doesn't scan the tracks table.
+# BPM/energy minimums and maximums come from their indexes instead, since a
+# trigger can't cheaply find the next extreme after a delete.
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS library_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    track_count INTEGER NOT NULL DEFAULT 0,
+    bpm_count INTEGER NOT NULL DEFAULT 0,
+    bpm_sum REAL NOT NULL DEFAULT 0.0,
+    energy_count INTEGER NOT NULL DEFAULT 0,
+    energy_sum REAL NOT NULL DEFAULT 0.0,
+    total_duration REAL NOT NULL DEFAULT 0.0
+);
+
+CREATE TABLE IF NOT EXISTS key_counts (
+    musical_key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS tracks_stats_ai AFTER INSERT ON tracks BEGIN
+    UPDATE library_totals SET
+        track_count = track_count + 1,
+        bpm_count = bpm_count + (CASE WHEN new.bpm > 0 THEN 1 ELSE 0 END),
+        bpm_sum = bpm_sum + (CASE WHEN new.bpm > 0 THEN new.bpm ELSE 0 END),
+        energy_count = energy_count + (CASE WHEN new.energy_level > 0 THEN 1 ELSE 0 END),
+        energy_sum = energy_sum + (CASE WHEN new.energy_level > 0 THEN new.energy_level ELSE 0 END),
+        total_duration = total_duration + COALESCE(new.duration, 0);
+    INSERT INTO key_counts (musical_key, count) SELECT new.musical_key, 1 WHERE new.musical_key <> ''
+        ON CONFLICT(musical_key) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tracks_stats_ad AFTER DELETE ON tracks BEGIN
+    UPDATE library_totals SET
+        track_count = track_count - 1,
+        bpm_count = bpm_count - (CASE WHEN old.bpm > 0 THEN 1 ELSE 0 END),
+        bpm_sum = bpm_sum - (CASE WHEN old.bpm > 0 THEN old.bpm ELSE 0 END),
+        energy_count = energy_count - (CASE WHEN old.energy_level > 0 THEN 1 ELSE 0 END),
+        energy_sum = energy_sum - (CASE WHEN old.energy_level > 0 THEN old.energy_level ELSE 0 END),
+        total_duration = total_duration - COALESCE(old.duration, 0);
+    UPDATE key_counts SET count = count - 1 WHERE musical_key = old.musical_key;
+    DELETE FROM key_counts WHERE musical_key = old.musical_key AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tracks_stats_au
+AFTER UPDATE OF bpm, energy_level, duration, musical_key ON tracks BEGIN
+    UPDATE library_totals SET
+        bpm_count = bpm_count
+            + (CASE WHEN new.bpm > 0 THEN 1 ELSE 0 END) - (CASE WHEN old.bpm > 0 THEN 1 ELSE 0 END),
+        bpm_sum = bpm_sum
+            + (CASE WHEN new.bpm > 0 THEN new.bpm ELSE 0 END) - (CASE WHEN old.bpm > 0 THEN old.bpm ELSE 0 END),
+        energy_count = energy_count
+            + (CASE WHEN new.energy_level > 0 THEN 1 ELSE 0 END)
+            - (CASE WHEN old.energy_level > 0 THEN 1 ELSE 0 END),
+        energy_sum = energy_sum
+            + (CASE WHEN new.energy_level > 0 THEN new.energy_level ELSE 0 END)
+            - (CASE WHEN old.energy_level > 0 THEN old.energy_level ELSE 0 END),
+        total_duration = total_duration + COALESCE(new.duration, 0) - COALESCE(old.duration, 0);
+    UPDATE key_counts SET count = count - 1 WHERE musical_key = old.musical_key;
+    DELETE FROM key_counts WHERE musical_key = old.musical_key AND count <= 0;
+    INSERT INTO key_counts (musical_key, count) SELECT new.musical_key, 1 WHERE new.musical_key <> ''
+        ON CONFLICT(musical_key) DO UPDATE SET count = count + 1;
+END;
 """
 
 
+# Full-text index over title/artist for search_tracks(query=...). It is kept in
+# its own script because FTS5 is an optional SQLite extension; without it
+# search falls back to LIKE.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+    title, artist, content='tracks', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS tracks_fts_ai AFTER INSERT ON tracks BEGIN
+    INSERT INTO tracks_fts(rowid, title, artist) VALUES (new.id, new.title, new.artist);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tracks_fts_ad AFTER DELETE ON tracks BEGIN
+    INSERT INTO tracks_fts(tracks_fts, rowid, title, artist)
+    VALUES ('delete', old.id, old.title, old.artist);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tracks_fts_au AFTER UPDATE OF title, artist ON tracks BEGIN
+    INSERT INTO tracks_fts(tracks_fts, rowid, title, artist)
+    VALUES ('delete', old.id, old.title, old.artist);
+    INSERT INTO tracks_fts(rowid, title, artist) VALUES (new.id, new.title, new.artist);
+END;
+"""
+
+_FTS_TOKEN_RE = re.compile(r"\w+")
+_FTS_TERM_RE = re.compile(r'"([^"]*)"|(\w+)')
+# unicode61 doesn't split CJK text into words, so such queries use LIKE.
+_CJK_RE = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+
+# WAL lets readers run alongside a writer and, with synchronous=NORMAL, only
+# fsyncs at checkpoints instead of on every commit.
+PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-64000;
+PRAGMA temp_store=MEMORY;
+"""
+
+_local = threading.local()
+
+# Schema creation and column migrations run once per database path per process;
+# connections opened later (e.g. by worker threads) only re-read the stamped
+# schema version, so a file that was deleted or replaced is prepared again.
+# Maps each prepared path to whether FTS5 is available on it.
+_schema_lock = threading.Lock()
+_schema_ready: dict[Path, bool] = {}
+
+
+@lru_cache(maxsize=1)
 def _get_db_path() -> Path:
     settings = get_settings()
     return settings.db_path()
 
 
-def _ensure_db() -> sqlite3.Connection:
-    db_path = _get_db_path()
+def reset_db_path() -> None:
+    """Forget the cached settings and database path so they're re-read on next use."""
+    get_settings.cache_clear()
+    _get_db_path.cache_clear()
+    with _schema_lock:
+        _schema_ready.clear()
+
+
+def _ensure_db(db_path: Path) -> sqlite3.Connection:
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
+    # Hot statements are module-level constants, so the per-connection statement
+    # cache (keyed by SQL text) reuses their prepared form across calls.
+    conn = sqlite3.connect(str(db_path), cached_statements=256)
     conn.row_factory = sqlite3.Row
+    conn.executescript(PRAGMAS)
+    with _schema_lock:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if db_path not in _schema_ready or version < SCHEMA_VERSION:
+            _schema_ready[db_path] = _prepare_schema(conn)
+    return conn
+
+
+def _prepare_schema(conn: sqlite3.Connection) -> bool:
+    """Bring the database up to SCHEMA_VERSION; return whether FTS5 is usable.
+
+    A database already stamped with the current version skips the schema
+    script and column checks entirely.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        fts_exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tracks_fts'"
+        ).fetchone()
+        return bool(fts_exists) or _ensure_fts(conn)
+
     conn.executescript(SCHEMA)
     _ensure_track_columns(conn)
-    return conn
+    conn.executescript(MIGRATED_INDEXES)
+    _rebuild_library_stats(conn)
+    fts = _ensure_fts(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return fts
+
+
+def _ensure_fts(conn: sqlite3.Connection) -> bool:
+    """Create the full-text index if needed; return whether FTS5 is usable.
+
+    An index built with an older tokenizer is dropped and rebuilt.
+    """
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tracks_fts'"
+    ).fetchone()
+    exists = row is not None and "remove_diacritics 2" in row["sql"]
+    try:
+        with conn:
+            if row is not None and not exists:
+                conn.execute("DROP TABLE tracks_fts")
+                for trigger in ("tracks_fts_ai", "tracks_fts_ad", "tracks_fts_au"):
+                    conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.executescript(FTS_SCHEMA)
+            if not exists:
+                # Index the tracks that were added before the table existed.
+                conn.execute("INSERT INTO tracks_fts(tracks_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def _rebuild_library_stats(conn: sqlite3.Connection) -> None:
+    """Create the stats tables and triggers and recount them from ``tracks``."""
+    with conn:
+        conn.executescript(STATS_SCHEMA)
+        conn.execute("DELETE FROM library_totals")
+        conn.execute(
+            """INSERT INTO library_totals
+                   (id, track_count, bpm_count, bpm_sum, energy_count, energy_sum, total_duration)
+               SELECT 1, COUNT(*),
+                      COUNT(CASE WHEN bpm > 0 THEN 1 END), TOTAL(CASE WHEN bpm > 0 THEN bpm END),
+                      COUNT(CASE WHEN energy_level > 0 THEN 1 END),
+                      TOTAL(CASE WHEN energy_level > 0 THEN energy_level END),
+                      TOTAL(duration)
+               FROM tracks"""
+        )
+        conn.execute("DELETE FROM key_counts")
+        conn.execute(
+            """INSERT INTO key_counts (musical_key, count)
+               SELECT musical_key, COUNT(*) FROM tracks WHERE musical_key <> '' GROUP BY musical_key"""
+        )
 
 
 def _ensure_track_columns(conn: sqlite3.Connection) -> None:
@@ -88,6 +310,8 @@ def _ensure_track_columns(conn: sqlite3.Connection) -> None:
         "review_notes": "TEXT DEFAULT ''",
         "has_overrides": "INTEGER DEFAULT 0",
         "analysis_version": "INTEGER DEFAULT 3",
+        "file_size": "INTEGER DEFAULT 0",
+        "file_mtime_ns": "INTEGER DEFAULT 0",
     }
 
     for name, spec in required.items():
@@ -97,154 +321,428 @@ def _ensure_track_columns(conn: sqlite3.Connection) -> None:
 
 
 def get_connection() -> sqlite3.Connection:
-    return _ensure_db()
+    """Return this thread's connection, opening it (and ensuring the schema) on first use.
+
+    Connections are cached per thread (sqlite3 connections can't be shared across
+    threads) and reopened if the configured database path changes.
+    """
+    db_path = _get_db_path()
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == db_path:
+        return conn
+    if conn is not None:
+        conn.close()
+    conn = _ensure_db(db_path)
+    _local.conn = conn
+    _local.path = db_path
+    _local.fts = _schema_ready[db_path]
+    return conn
+
+
+def close_connection() -> None:
+    """Close the calling thread's cached connection, if any."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+atexit.register(close_connection)
 
 
 # --- Track CRUD ---
 
+# Track reads select columns in model field order so rows can be zipped straight
+# into the model, and bulk reads skip sqlite3.Row (a plain tuple is cheaper).
+_TRACK_FIELDS = tuple(Track.model_fields)
+_TRACK_COLUMNS = ", ".join(_TRACK_FIELDS)
+_QUALIFIED_TRACK_COLUMNS = ", ".join(f"t.{name}" for name in _TRACK_FIELDS)
+_TRACK_BY_PATH_SQL = f"SELECT {_TRACK_COLUMNS} FROM tracks WHERE file_path = ?"
+_TRACK_BY_ID_SQL = f"SELECT {_TRACK_COLUMNS} FROM tracks WHERE id = ?"
+_TRACK_BY_HASH_SQL = f"SELECT {_TRACK_COLUMNS} FROM tracks WHERE file_hash = ?"
+
+
+def _row_to_track(row: Sequence) -> Track:
+    values = dict(zip(_TRACK_FIELDS, row))
+    # There are only 24 Camelot keys; share one string object per key across rows.
+    if values["musical_key"]:
+        values["musical_key"] = sys.intern(values["musical_key"])
+    return Track(**values)
+
+
+def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor
+
+
+_UPSERT_TRACK_SQL = """INSERT INTO tracks (
+       file_path,
+       file_hash,
+       title,
+       artist,
+       bpm,
+       musical_key,
+       energy_level,
+       energy_confidence,
+       duration,
+       preview_start,
+       needs_review,
+       review_notes,
+       has_overrides,
+       analysis_version,
+       file_size,
+       file_mtime_ns
+   )
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+   ON CONFLICT(file_path) DO UPDATE SET
+       file_hash=excluded.file_hash, title=excluded.title, artist=excluded.artist,
+       bpm=excluded.bpm, musical_key=excluded.musical_key,
+       energy_level=excluded.energy_level, energy_confidence=excluded.energy_confidence,
+       duration=excluded.duration, preview_start=excluded.preview_start,
+       needs_review=excluded.needs_review, review_notes=excluded.review_notes,
+       has_overrides=excluded.has_overrides,
+       analysis_version=excluded.analysis_version,
+       file_size=excluded.file_size, file_mtime_ns=excluded.file_mtime_ns"""
+
+
+def _track_params(track: Track) -> tuple:
+    return (
+        track.file_path,
+        track.file_hash,
+        track.title,
+        track.artist,
+        track.bpm,
+        track.musical_key.strip().upper(),
+        track.energy_level,
+        track.energy_confidence,
+        track.duration,
+        track.preview_start,
+        int(track.needs_review),
+        track.review_notes,
+        int(track.has_overrides),
+        track.analysis_version,
+        track.file_size,
+        track.file_mtime_ns,
+    )
+
+
 def upsert_track(track: Track) -> Track:
     conn = get_connection()
-    try:
+    with _writing_tracks(conn):
+        conn.execute(_UPSERT_TRACK_SQL, _track_params(track))
+    row = conn.execute(_TRACK_BY_PATH_SQL, (track.file_path,)).fetchone()
+    return _row_to_track(row)
+
+
+def upsert_tracks(tracks: Iterable[Track]) -> None:
+    """Insert or update many tracks in a single transaction (one commit/fsync)."""
+    rows = [_track_params(track) for track in tracks]
+    if not rows:
+        return
+    conn = get_connection()
+    with _writing_tracks(conn):
+        # Take the write lock up front rather than upgrading mid-batch, which can
+        # fail with SQLITE_BUSY if another connection is reading.
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(_UPSERT_TRACK_SQL, rows)
+
+
+def set_track_file_stat(track_id: int, file_size: int, file_mtime_ns: int) -> None:
+    """Record the size/mtime a track's file had when its hash was last verified."""
+    conn = get_connection()
+    with _writing_tracks(conn):
         conn.execute(
-            """INSERT INTO tracks (
-                   file_path,
-                   file_hash,
-                   title,
-                   artist,
-                   bpm,
-                   musical_key,
-                   energy_level,
-                   energy_confidence,
-                   duration,
-                   preview_start,
-                   needs_review,
-                   review_notes,
-                   has_overrides,
-                   analysis_version
-               )
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-               ON CONFLICT(file_path) DO UPDATE SET
-                   file_hash=excluded.file_hash, title=excluded.title, artist=excluded.artist,
-                   bpm=excluded.bpm, musical_key=excluded.musical_key,
-                   energy_level=excluded.energy_level, energy_confidence=excluded.energy_confidence,
-                   duration=excluded.duration, preview_start=excluded.preview_start,
-                   needs_review=excluded.needs_review, review_notes=excluded.review_notes,
-                   has_overrides=excluded.has_overrides,
-                   analysis_version=excluded.analysis_version""",
-            (
-                track.file_path,
-                track.file_hash,
-                track.title,
-                track.artist,
-                track.bpm,
-                track.musical_key,
-                track.energy_level,
-                track.energy_confidence,
-                track.duration,
-                track.preview_start,
-                int(track.needs_review),
-                track.review_notes,
-                int(track.has_overrides),
-                track.analysis_version,
-            ),
+            "UPDATE tracks SET file_size = ?, file_mtime_ns = ? WHERE id = ?",
+            (file_size, file_mtime_ns, track_id),
         )
-        conn.commit()
-        row = conn.execute("SELECT * FROM tracks WHERE file_path = ?", (track.file_path,)).fetchone()
-        return Track(**dict(row))
-    finally:
-        conn.close()
 
 
+# Point lookups by path/id are memoized per database path. Every write to the
+# tracks table in this module clears them, so they are only stale with respect
+# to writes made by other processes sharing the database file; call
+# invalidate_caches() after such writes.
+
 def get_track_by_path(file_path: str) -> Track | None:
+    return _get_track_by_path_cached(_get_db_path(), file_path)
+
+
+def get_track_by_id(track_id: int) -> Track | None:
+    return _get_track_by_id_cached(_get_db_path(), track_id)
+
+
+@lru_cache(maxsize=4096)
+def _get_track_by_path_cached(db_path: Path, file_path: str) -> Track | None:
+    conn = get_connection()
+    row = conn.execute(_TRACK_BY_PATH_SQL, (file_path,)).fetchone()
+    return _row_to_track(row) if row else None
+
+
+@lru_cache(maxsize=4096)
+def _get_track_by_id_cached(db_path: Path, track_id: int) -> Track | None:
     conn = get_connection()
+    row = conn.execute(_TRACK_BY_ID_SQL, (track_id,)).fetchone()
+    return _row_to_track(row) if row else None
+
+
+def _invalidate_track_lookups() -> None:
+    _get_track_by_path_cached.cache_clear()
+    _get_track_by_id_cached.cache_clear()
+
+
+def _invalidate_set_lookups() -> None:
+    _get_set_by_name_cached.cache_clear()
+    _get_all_sets_cached.cache_clear()
+    _get_gaps_cached.cache_clear()
+
+
+def invalidate_caches() -> None:
+    """Drop every memoized lookup, e.g. after another process wrote the database."""
+    _invalidate_track_lookups()
+    _invalidate_set_lookups()
+
+
+@contextmanager
+def _writing_sets(conn: sqlite3.Connection) -> Iterator[None]:
+    """Like ``_writing_tracks``, for writes to sets and their gaps."""
     try:
-        row = conn.execute("SELECT * FROM tracks WHERE file_path = ?", (file_path,)).fetchone()
-        return Track(**dict(row)) if row else None
+        with conn:
+            yield
     finally:
-        conn.close()
+        _invalidate_set_lookups()
 
 
-def get_track_by_id(track_id: int) -> Track | None:
-    conn = get_connection()
+@contextmanager
+def _writing_tracks(conn: sqlite3.Connection) -> Iterator[None]:
+    """Run a tracks write in a transaction, then drop the memoized lookups.
+
+    Clearing after the commit (rather than before) keeps a concurrent reader
+    from re-caching the pre-write row.
+    """
     try:
-        row = conn.execute("SELECT * FROM tracks WHERE id = ?", (track_id,)).fetchone()
-        return Track(**dict(row)) if row else None
+        with conn:
+            yield
     finally:
-        conn.close()
+        _invalidate_track_lookups()
+
+
+def get_tracks_by_ids(track_ids: Iterable[int]) -> dict[int, Track]:
+    """Fetch many tracks by id, keyed by id. Unknown ids are left out."""
+    ids = list(dict.fromkeys(track_ids))
+    cursor = _tuple_cursor(get_connection())
+    tracks: dict[int, Track] = {}
+    # Stay well under SQLite's bound-parameter limit.
+    for start in range(0, len(ids), 500):
+        chunk = ids[start : start + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        for row in cursor.execute(f"SELECT {_TRACK_COLUMNS} FROM tracks WHERE id IN ({placeholders})", chunk):
+            track = _row_to_track(row)
+            tracks[track.id] = track
+    return tracks
+
+
+def get_tracks_by_paths(file_paths: Iterable[str]) -> dict[str, Track]:
+    """Fetch many tracks by file path, keyed by path. Unknown paths are left out."""
+    paths = list(dict.fromkeys(file_paths))
+    cursor = _tuple_cursor(get_connection())
+    tracks: dict[str, Track] = {}
+    for start in range(0, len(paths), 500):
+        chunk = paths[start : start + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        for row in cursor.execute(f"SELECT {_TRACK_COLUMNS} FROM tracks WHERE file_path IN ({placeholders})", chunk):
+            track = _row_to_track(row)
+            tracks[track.file_path] = track
+    return tracks
 
 
 def get_track_by_hash(file_hash: str) -> Track | None:
     conn = get_connection()
-    try:
-        row = conn.execute("SELECT * FROM tracks WHERE file_hash = ?", (file_hash,)).fetchone()
-        return Track(**dict(row)) if row else None
-    finally:
-        conn.close()
+    row = conn.execute(_TRACK_BY_HASH_SQL, (file_hash,)).fetchone()
+    return _row_to_track(row) if row else None
 
 
 def get_all_tracks() -> list[Track]:
-    conn = get_connection()
-    try:
-        rows = conn.execute("SELECT * FROM tracks ORDER BY artist, title").fetchall()
-        return [Track(**dict(r)) for r in rows]
-    finally:
-        conn.close()
+    cursor = _tuple_cursor(get_connection())
+    # Build tracks straight off the cursor; a fetchall() first would hold every
+    # raw row alongside the finished list.
+    cursor.execute(f"SELECT {_TRACK_COLUMNS} FROM tracks ORDER BY artist, title")
+    return [_row_to_track(r) for r in cursor]
+
+
+def has_tracks() -> bool:
+    """Whether the library has any tracks, without loading them."""
+    row = get_connection().execute("SELECT EXISTS (SELECT 1 FROM tracks)").fetchone()
+    return bool(row[0])
+
+
+def library_stats() -> dict:
+    """Return library-wide counts and ranges without scanning the tracks table.
+
+    Totals come from the trigger-maintained ``library_totals`` row and the
+    ranges from the bpm/energy indexes. BPM and energy aggregates only consider
+    analyzed (non-zero) values and are ``None`` when there are none.
+    """
+    row = get_connection().execute(
+        """SELECT
+               track_count,
+               (SELECT MIN(bpm) FROM tracks WHERE bpm > 0) AS min_bpm,
+               (SELECT MAX(bpm) FROM tracks WHERE bpm > 0) AS max_bpm,
+               CASE WHEN bpm_count > 0 THEN bpm_sum / bpm_count END AS avg_bpm,
+               (SELECT MIN(energy_level) FROM tracks WHERE energy_level > 0) AS min_energy,
+               (SELECT MAX(energy_level) FROM tracks WHERE energy_level > 0) AS max_energy,
+               CASE WHEN energy_count > 0 THEN energy_sum / energy_count END AS avg_energy,
+               CASE WHEN track_count > 0 THEN total_duration ELSE 0.0 END AS total_duration
+           FROM library_totals"""
+    ).fetchone()
+    return dict(row)
+
+
+def key_histogram(limit: int = 10) -> list[tuple[str, int]]:
+    """Return the most common Camelot keys with their track counts.
+
+    Read from the trigger-maintained ``key_counts`` table; ties are ordered by key.
+    """
+    rows = get_connection().execute(
+        "SELECT musical_key, count FROM key_counts ORDER BY count DESC, musical_key LIMIT ?",
+        (limit,),
+    ).fetchall()
+    return [(row["musical_key"], row["count"]) for row in rows]
+
+
+def file_hash_counts() -> dict[str, int]:
+    """Return how many tracks share each file hash."""
+    cursor = _tuple_cursor(get_connection())
+    return dict(cursor.execute("SELECT file_hash, COUNT(*) FROM tracks GROUP BY file_hash"))
 
 
 def search_tracks(
     bpm_min: float | None = None,
     bpm_max: float | None = None,
-    key: str | None = None,
+    key: str | Sequence[str] | None = None,
     energy_min: float | None = None,
     energy_max: float | None = None,
     query: str | None = None,
     needs_review: bool | None = None,
 ) -> list[Track]:
+    """Filter the library.
+
+    ``key`` may be one Camelot key or several (matching any of them), in stored
+    (uppercase) form.
+    """
     conn = get_connection()
-    try:
-        conditions = []
-        params: list = []
-        if bpm_min is not None:
-            conditions.append("bpm >= ?")
-            params.append(bpm_min)
-        if bpm_max is not None:
-            conditions.append("bpm <= ?")
-            params.append(bpm_max)
-        if key:
-            conditions.append("musical_key = ?")
-            params.append(key.upper())
-        if energy_min is not None:
-            conditions.append("energy_level >= ?")
-            params.append(energy_min)
-        if energy_max is not None:
-            conditions.append("energy_level <= ?")
-            params.append(energy_max)
-        if query:
-            conditions.append("(title LIKE ? OR artist LIKE ?)")
+    keys = [key] if isinstance(key, str) else list(dict.fromkeys(key or ()))
+    keys = [k for k in keys if k]
+    if len(keys) > 2:
+        # Pad multi-key lists to a power of two by repeating the last key, so
+        # arbitrary key counts share a handful of cached statements.
+        keys.extend(keys[-1:] * ((1 << (len(keys) - 1).bit_length()) - len(keys)))
+    params: list = [p for p in (bpm_min, bpm_max) if p is not None]
+    params.extend(keys)
+    params.extend(p for p in (energy_min, energy_max) if p is not None)
+
+    text_match = ""
+    if query:
+        fts_query = _fts_prefix_query(query) if _local.fts else ""
+        if fts_query:
+            text_match = "fts"
+            params.append(fts_query)
+        else:
+            text_match = "like"
             params.extend([f"%{query}%", f"%{query}%"])
-        if needs_review is True:
-            conditions.append("needs_review = 1")
 
-        where = " AND ".join(conditions) if conditions else "1=1"
-        rows = conn.execute(
-            f"SELECT * FROM tracks WHERE {where} ORDER BY needs_review DESC, energy_confidence ASC, bpm",
-            params,
-        ).fetchall()
-        return [Track(**dict(r)) for r in rows]
-    finally:
-        conn.close()
+    shape = (
+        bpm_min is not None,
+        bpm_max is not None,
+        len(keys),
+        energy_min is not None,
+        energy_max is not None,
+        text_match,
+        needs_review is True,
+    )
+    cursor = _tuple_cursor(conn).execute(_search_sql(shape), params)
+    return [_row_to_track(r) for r in cursor]
+
+
+@lru_cache(maxsize=128)
+def _search_sql(shape: tuple[bool, bool, int, bool, bool, str, bool]) -> str:
+    """Build the search statement for one combination of active filters.
+
+    Reusing the exact same SQL text per combination lets sqlite3's statement
+    cache skip re-preparing it. Placeholders follow the order of ``shape``.
+    """
+    has_bpm_min, has_bpm_max, key_count, has_energy_min, has_energy_max, text_match, review_only = shape
+    source = "tracks t"
+    conditions = []
+    if has_bpm_min:
+        conditions.append("t.bpm >= ?")
+    if has_bpm_max:
+        conditions.append("t.bpm <= ?")
+    if key_count == 1:
+        conditions.append("t.musical_key = ?")
+    elif key_count > 1:
+        conditions.append(f"t.musical_key IN ({', '.join('?' * key_count)})")
+    if has_energy_min:
+        conditions.append("t.energy_level >= ?")
+    if has_energy_max:
+        conditions.append("t.energy_level <= ?")
+    if text_match == "fts":
+        # CROSS JOIN pins the text match as the outer loop. Left to itself the
+        # planner may drive from a bpm/key index once ANALYZE stats exist and
+        # probe the FTS table per candidate row, which is far slower.
+        source = "tracks_fts CROSS JOIN tracks t ON t.id = tracks_fts.rowid"
+        conditions.append("tracks_fts MATCH ?")
+    elif text_match == "like":
+        conditions.append("(t.title LIKE ? OR t.artist LIKE ?)")
+    if review_only:
+        conditions.append("t.needs_review = 1")
+
+    where = " AND ".join(conditions) if conditions else "1=1"
+    return (
+        f"SELECT {_QUALIFIED_TRACK_COLUMNS} FROM {source} WHERE {where}"
+        " ORDER BY t.needs_review DESC, t.energy_confidence ASC, t.bpm"
+    )
+
+
+def refresh_planner_stats() -> None:
+    """Run ANALYZE so the query planner has current statistics for the indexes.
+
+    Cheap at library sizes; call it after bulk changes such as a scan.
+    """
+    get_connection().execute("ANALYZE")
+
+
+def _fts_prefix_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix.
+
+    Double-quoted parts of the text match as exact phrases. Words are quoted
+    so FTS syntax in user input (AND, OR, NOT, ``*``...) is taken literally.
+    Returns "" when the text has no indexable words or contains CJK text.
+    """
+    if _CJK_RE.search(query):
+        return ""
+    terms = []
+    for phrase, word in _FTS_TERM_RE.findall(query):
+        if word:
+            terms.append(f'"{word}"*')
+        elif tokens := _FTS_TOKEN_RE.findall(phrase):
+            terms.append('"' + " ".join(tokens) + '"')
+    return " ".join(terms)
 
 
 def get_track_override(file_path: str) -> dict | None:
     conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT file_path, bpm, musical_key, energy_level FROM track_overrides WHERE file_path = ?",
-            (file_path,),
-        ).fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
+    row = conn.execute(
+        "SELECT file_path, bpm, musical_key, energy_level FROM track_overrides WHERE file_path = ?",
+        (file_path,),
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def get_all_track_overrides() -> dict[str, dict]:
+    """Every manual override, keyed by file path."""
+    conn = get_connection()
+    rows = conn.execute("SELECT file_path, bpm, musical_key, energy_level FROM track_overrides")
+    return {row["file_path"]: dict(row) for row in rows}
 
 
 def upsert_track_override(
@@ -254,7 +752,7 @@ def upsert_track_override(
     energy_level: float | None = None,
 ) -> None:
     conn = get_connection()
-    try:
+    with conn:
         conn.execute(
             """INSERT INTO track_overrides (file_path, bpm, musical_key, energy_level, updated_at)
                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
@@ -265,18 +763,12 @@ def upsert_track_override(
                    updated_at=CURRENT_TIMESTAMP""",
             (file_path, bpm, musical_key, energy_level),
         )
-        conn.commit()
-    finally:
-        conn.close()
 
 
 def delete_track_override(file_path: str) -> None:
     conn = get_connection()
-    try:
+    with conn:
         conn.execute("DELETE FROM track_overrides WHERE file_path = ?", (file_path,))
-        conn.commit()
-    finally:
-        conn.close()
 
 
 def delete_tracks_by_ids(track_ids: list[int]) -> dict[str, int]:
@@ -292,51 +784,34 @@ def delete_tracks_by_ids(track_ids: list[int]) -> dict[str, int]:
         }
 
     conn = get_connection()
-    try:
+    with _writing_tracks(conn):
+        # Each DELETE ... RETURNING both removes rows and reports what it removed,
+        # so no separate SELECT/COUNT passes are needed.
         id_placeholders = ",".join(["?"] * len(unique_ids))
-        existing_rows = conn.execute(
-            f"SELECT id, file_path FROM tracks WHERE id IN ({id_placeholders})",
+        deleted_rows = conn.execute(
+            f"DELETE FROM tracks WHERE id IN ({id_placeholders}) RETURNING id, file_path",
             unique_ids,
         ).fetchall()
-        existing_ids = [int(row["id"]) for row in existing_rows]
-        file_paths = [str(row["file_path"]) for row in existing_rows]
-        missing = len(unique_ids) - len(existing_ids)
-
-        if not existing_ids:
-            return {
-                "requested": len(unique_ids),
-                "deleted": 0,
-                "missing": missing,
-                "removed_from_sets": 0,
-                "cleared_gap_sets": 0,
-            }
-
-        existing_placeholders = ",".join(["?"] * len(existing_ids))
-        removed_from_sets = int(
-            conn.execute(
-                f"SELECT COUNT(*) AS count FROM set_tracks WHERE track_id IN ({existing_placeholders})",
-                existing_ids,
-            ).fetchone()["count"]
-        )
-        affected_set_rows = conn.execute(
-            f"SELECT DISTINCT set_id FROM set_tracks WHERE track_id IN ({existing_placeholders})",
-            existing_ids,
-        ).fetchall()
-        affected_set_ids = [int(row["set_id"]) for row in affected_set_rows]
-
-        conn.execute(
-            f"DELETE FROM set_tracks WHERE track_id IN ({existing_placeholders})",
-            existing_ids,
-        )
+        deleted_ids = [int(row["id"]) for row in deleted_rows]
+        file_paths = [str(row["file_path"]) for row in deleted_rows]
+
+        removed_from_sets = 0
+        affected_set_ids: set[int] = set()
+        if deleted_ids:
+            deleted_placeholders = ",".join(["?"] * len(deleted_ids))
+            set_rows = conn.execute(
+                f"DELETE FROM set_tracks WHERE track_id IN ({deleted_placeholders}) RETURNING set_id",
+                deleted_ids,
+            ).fetchall()
+            removed_from_sets = len(set_rows)
+            affected_set_ids = {int(row["set_id"]) for row in set_rows}
 
-        cleared_gap_sets = 0
         if affected_set_ids:
             gap_placeholders = ",".join(["?"] * len(affected_set_ids))
             conn.execute(
                 f"DELETE FROM gaps WHERE set_id IN ({gap_placeholders})",
-                affected_set_ids,
+                sorted(affected_set_ids),
             )
-            cleared_gap_sets = len(affected_set_ids)
 
         if file_paths:
             path_placeholders = ",".join(["?"] * len(file_paths))
@@ -344,123 +819,128 @@ def delete_tracks_by_ids(track_ids: list[int]) -> dict[str, int]:
                 f"DELETE FROM track_overrides WHERE file_path IN ({path_placeholders})",
                 file_paths,
             )
-
-        deleted_rows = conn.execute(
-            f"DELETE FROM tracks WHERE id IN ({existing_placeholders})",
-            existing_ids,
-        ).rowcount
-        conn.commit()
-
-        deleted = deleted_rows if deleted_rows is not None and deleted_rows >= 0 else len(existing_ids)
-        return {
-            "requested": len(unique_ids),
-            "deleted": int(deleted),
-            "missing": int(missing),
-            "removed_from_sets": removed_from_sets,
-            "cleared_gap_sets": int(cleared_gap_sets),
-        }
-    finally:
-        conn.close()
+    # Gap rows for the affected sets went too.
+    _invalidate_set_lookups()
+
+    return {
+        "requested": len(unique_ids),
+        "deleted": len(deleted_ids),
+        "missing": len(unique_ids) - len(deleted_ids),
+        "removed_from_sets": removed_from_sets,
+        "cleared_gap_sets": len(affected_set_ids),
+    }
 
 
 # --- Set CRUD ---
 
 def create_set(set_plan: SetPlan) -> SetPlan:
     conn = get_connection()
-    try:
+    with _writing_sets(conn):
         conn.execute(
             "INSERT INTO sets (name, description, target_duration) VALUES (?, ?, ?)",
             (set_plan.name, set_plan.description, set_plan.target_duration),
         )
-        conn.commit()
-        row = conn.execute("SELECT * FROM sets WHERE name = ?", (set_plan.name,)).fetchone()
-        return SetPlan(**dict(row))
-    finally:
-        conn.close()
+    row = conn.execute("SELECT * FROM sets WHERE name = ?", (set_plan.name,)).fetchone()
+    return SetPlan(**dict(row))
 
 
 def get_set_by_name(name: str) -> SetPlan | None:
+    return _get_set_by_name_cached(_get_db_path(), name)
+
+
+@lru_cache(maxsize=1024)
+def _get_set_by_name_cached(db_path: Path, name: str) -> SetPlan | None:
     conn = get_connection()
-    try:
-        row = conn.execute("SELECT * FROM sets WHERE name = ?", (name,)).fetchone()
-        return SetPlan(**dict(row)) if row else None
-    finally:
-        conn.close()
+    row = conn.execute("SELECT * FROM sets WHERE name = ?", (name,)).fetchone()
+    return SetPlan(**dict(row)) if row else None
 
 
 def get_all_sets() -> list[SetPlan]:
+    return list(_get_all_sets_cached(_get_db_path()))
+
+
+@lru_cache(maxsize=16)
+def _get_all_sets_cached(db_path: Path) -> tuple[SetPlan, ...]:
     conn = get_connection()
-    try:
-        rows = conn.execute("SELECT * FROM sets ORDER BY id DESC").fetchall()
-        return [SetPlan(**dict(r)) for r in rows]
-    finally:
-        conn.close()
+    rows = conn.execute("SELECT * FROM sets ORDER BY id DESC").fetchall()
+    return tuple(SetPlan(**dict(r)) for r in rows)
 
 
 def delete_set(name: str) -> bool:
     conn = get_connection()
-    try:
-        s = get_set_by_name(name)
-        if not s or s.id is None:
+    # Look the set up inside the same transaction as the deletes so a concurrent
+    # rename/delete can't slip in between.
+    with _writing_sets(conn):
+        row = conn.execute("SELECT id FROM sets WHERE name = ?", (name,)).fetchone()
+        if row is None:
             return False
-        conn.execute("DELETE FROM set_tracks WHERE set_id = ?", (s.id,))
-        conn.execute("DELETE FROM gaps WHERE set_id = ?", (s.id,))
-        conn.execute("DELETE FROM sets WHERE id = ?", (s.id,))
-        conn.commit()
-        return True
-    finally:
-        conn.close()
+        conn.execute("DELETE FROM set_tracks WHERE set_id = ?", (row["id"],))
+        conn.execute("DELETE FROM gaps WHERE set_id = ?", (row["id"],))
+        conn.execute("DELETE FROM sets WHERE id = ?", (row["id"],))
+    return True
 
 
 # --- Set Tracks ---
 
+_SET_TRACK_COLUMNS = ("set_id", "track_id", "position", "transition_score")
+
+
 def set_set_tracks(set_id: int, tracks: list[SetTrack]) -> None:
     conn = get_connection()
-    try:
+    with _writing_sets(conn):
         conn.execute("DELETE FROM set_tracks WHERE set_id = ?", (set_id,))
-        for st in tracks:
-            conn.execute(
-                "INSERT INTO set_tracks (set_id, track_id, position, transition_score) VALUES (?, ?, ?, ?)",
-                (st.set_id, st.track_id, st.position, st.transition_score),
-            )
-        conn.commit()
-    finally:
-        conn.close()
+        conn.executemany(
+            "INSERT INTO set_tracks (set_id, track_id, position, transition_score) VALUES (?, ?, ?, ?)",
+            [(st.set_id, st.track_id, st.position, st.transition_score) for st in tracks],
+        )
 
 
 def get_set_tracks(set_id: int) -> list[SetTrack]:
     conn = get_connection()
-    try:
-        rows = conn.execute(
-            "SELECT * FROM set_tracks WHERE set_id = ? ORDER BY position", (set_id,)
-        ).fetchall()
-        return [SetTrack(**dict(r)) for r in rows]
-    finally:
-        conn.close()
+    rows = conn.execute(
+        "SELECT * FROM set_tracks WHERE set_id = ? ORDER BY position", (set_id,)
+    ).fetchall()
+    return [SetTrack(**dict(r)) for r in rows]
+
+
+def get_set_tracks_with_tracks(set_id: int) -> list[tuple[SetTrack, Track]]:
+    """Return a set's entries in order, each paired with its track.
+
+    Entries whose track no longer exists are omitted.
+    """
+    rows = _tuple_cursor(get_connection()).execute(
+        f"""SELECT st.set_id, st.track_id, st.position, st.transition_score, {_QUALIFIED_TRACK_COLUMNS}
+            FROM set_tracks st JOIN tracks t ON t.id = st.track_id
+            WHERE st.set_id = ? ORDER BY st.position""",
+        (set_id,),
+    ).fetchall()
+    width = len(_SET_TRACK_COLUMNS)
+    return [
+        (SetTrack(**dict(zip(_SET_TRACK_COLUMNS, row[:width]))), _row_to_track(row[width:]))
+        for row in rows
+    ]
 
 
 # --- Gaps ---
 
 def set_gaps(set_id: int, gaps: list[Gap]) -> None:
     conn = get_connection()
-    try:
+    with _writing_sets(conn):
         conn.execute("DELETE FROM gaps WHERE set_id = ?", (set_id,))
-        for g in gaps:
-            conn.execute(
-                "INSERT INTO gaps (set_id, position, suggested_bpm, suggested_key, suggested_energy, suggested_vibe) VALUES (?, ?, ?, ?, ?, ?)",
-                (g.set_id, g.position, g.suggested_bpm, g.suggested_key, g.suggested_energy, g.suggested_vibe),
-            )
-        conn.commit()
-    finally:
-        conn.close()
+        conn.executemany(
+            "INSERT INTO gaps (set_id, position, suggested_bpm, suggested_key, suggested_energy, suggested_vibe) VALUES (?, ?, ?, ?, ?, ?)",
+            [(g.set_id, g.position, g.suggested_bpm, g.suggested_key, g.suggested_energy, g.suggested_vibe) for g in gaps],
+        )
 
 
 def get_gaps(set_id: int) -> list[Gap]:
+    return list(_get_gaps_cached(_get_db_path(), set_id))
+
+
+@lru_cache(maxsize=1024)
+def _get_gaps_cached(db_path: Path, set_id: int) -> tuple[Gap, ...]:
     conn = get_connection()
-    try:
-        rows = conn.execute(
-            "SELECT * FROM gaps WHERE set_id = ? ORDER BY position", (set_id,)
-        ).fetchall()
-        return [Gap(**dict(r)) for r in rows]
-    finally:
-        conn.close()
+    rows = conn.execute(
+        "SELECT * FROM gaps WHERE set_id = ? ORDER BY position", (set_id,)
+    ).fetchall()
+    return tuple(Gap(**dict(r)) for r in rows)
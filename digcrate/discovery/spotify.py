@@ -49,17 +49,23 @@ def search_tracks(
     search_query = " ".join(parts)
     results = sp.search(q=search_query, type="track", limit=min(limit * 3, 50))
 
+    items = results.get("tracks", {}).get("items", [])
+    if not items:
+        return []
+
+    # Fetch audio features for BPM/energy matching in one request (the endpoint
+    # takes up to 100 IDs; search returns at most 50).
+    track_ids = [item["id"] for item in items]
+    try:
+        features = sp.audio_features(track_ids) or []
+    except Exception:
+        return []
+    features_by_id = dict(zip(track_ids, features))
+
     tracks = []
-    for item in results.get("tracks", {}).get("items", []):
-        track_id = item["id"]
-
-        # Get audio features for BPM/energy matching
-        try:
-            features = sp.audio_features([track_id])
-            if not features or not features[0]:
-                continue
-            feat = features[0]
-        except Exception:
+    for item in items:
+        feat = features_by_id.get(item["id"])
+        if not feat:
             continue
 
         track_bpm = feat.get("tempo", 0)
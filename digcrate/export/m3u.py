@@ -2,8 +2,7 @@
 
 from pathlib import Path
 
-from digcrate.db import get_set_by_name, get_set_tracks, get_track_by_id
-from digcrate.models import Track
+from digcrate.db import get_set_by_name, get_set_tracks_with_tracks
 
 
 def export_m3u(set_name: str, output_path: str | None = None) -> str | None:
@@ -15,16 +14,10 @@ def export_m3u(set_name: str, output_path: str | None = None) -> str | None:
     if not set_plan or set_plan.id is None:
         return None
 
-    set_tracks = get_set_tracks(set_plan.id)
-    if not set_tracks:
+    tracks = [track for _, track in get_set_tracks_with_tracks(set_plan.id)]
+    if not tracks:
         return None
 
-    tracks: list[Track] = []
-    for st in set_tracks:
-        track = get_track_by_id(st.track_id)
-        if track:
-            tracks.append(track)
-
     if not output_path:
         safe_name = set_name.replace(" ", "_").replace("/", "-")
         output_path = f"{safe_name}.m3u"
@@ -32,12 +25,10 @@ def export_m3u(set_name: str, output_path: str | None = None) -> str | None:
     output_file = Path(output_path).expanduser()
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
-    lines = ["#EXTM3U", f"#PLAYLIST:{set_name}"]
-    for track in tracks:
-        duration = int(track.duration)
-        display = track.display_name
-        lines.append(f"#EXTINF:{duration},{display}")
-        lines.append(track.file_path)
-
-    output_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    with output_file.open("w", encoding="utf-8", buffering=1 << 16) as f:
+        f.write(f"#EXTM3U\n#PLAYLIST:{set_name}\n")
+        f.writelines(
+            f"#EXTINF:{int(track.duration)},{track.display_name}\n{track.file_path}\n"
+            for track in tracks
+        )
     return str(output_file)
@@ -1,18 +1,15 @@
 """Rekordbox XML playlist export."""
 
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from urllib.parse import quote
 
-from digcrate.db import get_set_by_name, get_set_tracks, get_track_by_id
-from digcrate.models import Track
+from digcrate.db import get_set_by_name, get_set_tracks_with_tracks
 
-# Camelot to Rekordbox key ID mapping
+# Camelot to Rekordbox key ID mapping: 1A=0, 1B=1, 2A=2, ... 12B=23
 CAMELOT_TO_REKORDBOX_KEY = {
-    "1A": 0, "1B": 1, "2A": 2, "2B": 3, "3A": 4, "3B": 5,
-    "4A": 6, "4B": 7, "5A": 8, "5B": 9, "6A": 10, "6B": 11,
-    "7A": 12, "7B": 13, "8A": 14, "8B": 15, "9A": 16, "9B": 17,
-    "10A": 18, "10B": 19, "11A": 20, "11B": 21, "12A": 22, "12B": 23,
+    f"{number}{mode}": (number - 1) * 2 + offset
+    for number in range(1, 13)
+    for offset, mode in enumerate("AB")
 }
 
 
@@ -25,56 +22,68 @@ def export_rekordbox(set_name: str, output_path: str | None = None) -> str | Non
     if not set_plan or set_plan.id is None:
         return None
 
-    set_tracks = get_set_tracks(set_plan.id)
-    if not set_tracks:
+    tracks = [track for _, track in get_set_tracks_with_tracks(set_plan.id)]
+    if not tracks:
         return None
 
-    tracks: list[Track] = []
-    for st in set_tracks:
-        track = get_track_by_id(st.track_id)
-        if track:
-            tracks.append(track)
-
     if not output_path:
         safe_name = set_name.replace(" ", "_").replace("/", "-")
         output_path = f"{safe_name}.xml"
     output_file = Path(output_path).expanduser()
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
-    # Build Rekordbox XML
-    root = ET.Element("DJ_PLAYLISTS", Version="1.0.0")
-    product = ET.SubElement(root, "PRODUCT", Name="DigCrate", Version="0.1.0")
-    collection = ET.SubElement(root, "COLLECTION", Entries=str(len(tracks)))
-
-    for i, track in enumerate(tracks):
-        file_path = Path(track.file_path)
-        location = "file://localhost" + quote(str(file_path.resolve()))
-        key_id = CAMELOT_TO_REKORDBOX_KEY.get(track.musical_key.upper(), 0)
-
-        ET.SubElement(collection, "TRACK", {
-            "TrackID": str(i + 1),
-            "Name": track.title or file_path.stem,
-            "Artist": track.artist,
-            "TotalTime": str(int(track.duration)),
-            "AverageBpm": f"{track.bpm:.2f}",
-            "Tonality": track.musical_key,
-            "Location": location,
-        })
-
-    # Playlist node
-    playlists = ET.SubElement(root, "PLAYLISTS")
-    playlist_root = ET.SubElement(playlists, "NODE", Type="0", Name="ROOT", Count="1")
-    playlist_node = ET.SubElement(playlist_root, "NODE", {
-        "Type": "1",
-        "Name": set_name,
-        "KeyType": "0",
-        "Entries": str(len(tracks)),
-    })
-
-    for i in range(len(tracks)):
-        ET.SubElement(playlist_node, "TRACK", Key=str(i + 1))
-
-    tree = ET.ElementTree(root)
-    ET.indent(tree, space="  ")
-    tree.write(str(output_file), encoding="utf-8", xml_declaration=True)
+    # Written line by line rather than through an ElementTree so large sets are
+    # streamed to disk; the layout matches what ET.indent used to produce.
+    with output_file.open("w", encoding="utf-8", newline="\n", buffering=1 << 16) as f:
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        f.write('<DJ_PLAYLISTS Version="1.0.0">\n')
+        f.write('  <PRODUCT Name="DigCrate" Version="0.1.0" />\n')
+        f.write(f'  <COLLECTION Entries="{len(tracks)}">\n')
+
+        # Sets usually draw from a few folders, so resolve each folder once
+        # rather than walking every track's full path.
+        resolved_dirs: dict[str, Path] = {}
+        for i, track in enumerate(tracks):
+            file_path = Path(track.file_path)
+            parent = str(file_path.parent)
+            resolved_parent = resolved_dirs.get(parent)
+            if resolved_parent is None:
+                resolved_parent = resolved_dirs[parent] = file_path.parent.resolve()
+            location = "file://localhost" + quote(str(resolved_parent / file_path.name))
+
+            f.write(
+                f'    <TRACK TrackID="{i + 1}"'
+                f' Name="{_attr(track.title or file_path.stem)}"'
+                f' Artist="{_attr(track.artist)}"'
+                f' TotalTime="{int(track.duration)}"'
+                f' AverageBpm="{track.bpm:.2f}"'
+                f' Tonality="{_attr(track.musical_key)}"'
+                f' Location="{_attr(location)}" />\n'
+            )
+
+        f.write("  </COLLECTION>\n")
+        f.write("  <PLAYLISTS>\n")
+        f.write('    <NODE Type="0" Name="ROOT" Count="1">\n')
+        f.write(f'      <NODE Type="1" Name="{_attr(set_name)}" KeyType="0" Entries="{len(tracks)}">\n')
+        f.writelines(f'        <TRACK Key="{i + 1}" />\n' for i in range(len(tracks)))
+        f.write("      </NODE>\n")
+        f.write("    </NODE>\n")
+        f.write("  </PLAYLISTS>\n")
+        f.write("</DJ_PLAYLISTS>")
     return str(output_file)
+
+
+_ATTR_ESCAPES = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "\r": "&#13;",
+    "\n": "&#10;",
+    "\t": "&#09;",
+})
+
+
+def _attr(value: str) -> str:
+    """Escape a value for use inside a double-quoted XML attribute."""
+    return value.translate(_ATTR_ESCAPES)
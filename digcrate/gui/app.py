@@ -4,11 +4,12 @@ from __future__ import annotations
 
 import platform
 import sys
+from contextlib import contextmanager
 from functools import partial
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterator
 
-from PySide6.QtCore import Qt, QThreadPool, QTimer, QUrl
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QStringListModel, Qt, QThreadPool, QTimer, QUrl
 from PySide6.QtGui import QAction, QDesktopServices, QKeySequence
 from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
 from PySide6.QtWidgets import (
@@ -36,6 +37,7 @@ from PySide6.QtWidgets import (
     QSplitter,
     QStackedWidget,
     QStyleFactory,
+    QTableView,
     QTableWidget,
     QTableWidgetItem,
     QTextEdit,
@@ -45,14 +47,150 @@ from PySide6.QtWidgets import (
 
 from digcrate.gui import services
 from digcrate.gui.worker import Worker
+from digcrate.models import Track
+
+
+@contextmanager
+def _bulk_update(table: QTableWidget) -> Iterator[None]:
+    """Suspend repaints, sorting and signals while a table is refilled.
+
+    Content-sized columns are switched to fixed widths for the duration, so
+    they're measured once at the end instead of after every ``setItem``.
+    """
+    header = table.horizontalHeader()
+    modes = [header.sectionResizeMode(column) for column in range(table.columnCount())]
+    sorting = table.isSortingEnabled()
+    table.setUpdatesEnabled(False)
+    table.setSortingEnabled(False)
+    table.blockSignals(True)
+    for column, mode in enumerate(modes):
+        if mode == QHeaderView.ResizeToContents:
+            header.setSectionResizeMode(column, QHeaderView.Interactive)
+    try:
+        yield
+    finally:
+        for column, mode in enumerate(modes):
+            header.setSectionResizeMode(column, mode)
+        table.blockSignals(False)
+        table.setSortingEnabled(sorting)
+        table.setUpdatesEnabled(True)
+
+
+def _sync_set_names(model: QStringListModel) -> None:
+    """Bring the shared set-name model in line with the sets in the database.
+
+    Rows are removed and inserted individually rather than resetting the
+    model, so every combo box showing it keeps its current selection.
+    """
+    names = [set_plan.name for set_plan in services.list_sets()]
+    current = model.stringList()
+    if current == names:
+        return
+
+    wanted = set(names)
+    for row in reversed(range(len(current))):
+        if current[row] not in wanted:
+            model.removeRows(row, 1)
+    present = set(model.stringList())
+    for row, name in enumerate(names):
+        if name not in present:
+            model.insertRows(row, 1)
+            model.setData(model.index(row), name)
+    if model.stringList() != names:
+        model.setStringList(names)
+
+
+class TrackTableModel(QAbstractTableModel):
+    """Read-only model over library search results.
+
+    Cells are formatted on demand, so a refresh costs one model reset rather
+    than a widget item per cell. Status and duplicate labels are worked out
+    once per refresh and kept alongside the tracks; Status starts out pending
+    and is filled in by ``set_existing``.
+    """
+
+    HEADERS = ("Artist", "Title", "BPM", "Key", "Energy", "Status", "Dupes", "Path")
+    PENDING_STATUS = "…"
+    STATUS_COLUMN = 5
+    DUPES_COLUMN = 6
+    _FORMATTERS: tuple[Callable[[Track], str] | None, ...] = (
+        lambda track: track.artist,
+        lambda track: track.title,
+        lambda track: f"{track.bpm:.0f}",
+        lambda track: track.musical_key,
+        lambda track: f"{track.energy_level:.2f}",
+        None,
+        None,
+        lambda track: track.file_path,
+    )
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._tracks: list[Track] = []
+        self._status: list[str] = []
+        self._dupes: list[str] = []
+
+    def set_tracks(self, tracks: list[Track], hash_counts: dict[str, int]) -> None:
+        self.beginResetModel()
+        self._tracks = tracks
+        self._status = [self.PENDING_STATUS] * len(tracks)
+        self._dupes = []
+        for track in tracks:
+            duplicates = hash_counts.get(track.file_hash, 0)
+            self._dupes.append(f"x{duplicates}" if duplicates > 1 else "")
+        self.endResetModel()
+
+    def set_existing(self, tracks: list[Track], existing: set[str]) -> None:
+        """Fill in the Status column once a background existence check is done.
+
+        Ignored if the model has been refreshed with other tracks since.
+        """
+        if tracks is not self._tracks or not tracks:
+            return
+        self._status = ["Online" if track.file_path in existing else "Missing" for track in tracks]
+        self.dataChanged.emit(
+            self.index(0, self.STATUS_COLUMN),
+            self.index(len(tracks) - 1, self.STATUS_COLUMN),
+            [Qt.DisplayRole],
+        )
+
+    def track(self, row: int) -> Track | None:
+        if 0 <= row < len(self._tracks):
+            return self._tracks[row]
+        return None
+
+    def is_online(self, row: int) -> bool:
+        """Whether the background existence check found the row's file."""
+        return 0 <= row < len(self._status) and self._status[row] == "Online"
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._tracks)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if column == self.STATUS_COLUMN:
+            return self._status[row]
+        if column == self.DUPES_COLUMN:
+            return self._dupes[row]
+        return self._FORMATTERS[column](self._tracks[row])
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
 
 
 class LibraryTab(QWidget):
     def __init__(self, thread_pool: QThreadPool) -> None:
         super().__init__()
         self.thread_pool = thread_pool
-        self.search_results = []
         self.preview_seconds = 30
+        self._search_generation = 0
 
         root = QVBoxLayout(self)
 
@@ -99,26 +237,44 @@ class LibraryTab(QWidget):
         search_btn = QPushButton("Search")
         search_btn.clicked.connect(self._search)
 
+        # Search as the user types, but only once typing pauses.
+        self._search_debounce = QTimer(self)
+        self._search_debounce.setSingleShot(True)
+        self._search_debounce.setInterval(200)
+        self._search_debounce.timeout.connect(self._live_search)
+        for field in (self.bpm_input, self.key_input, self.energy_input, self.query_input):
+            field.textChanged.connect(lambda _text: self._search_debounce.start())
+            field.returnPressed.connect(self._search)
+
         filters.addWidget(self.bpm_input)
         filters.addWidget(self.key_input)
         filters.addWidget(self.energy_input)
         filters.addWidget(self.query_input)
         filters.addWidget(search_btn)
 
-        self.search_table = QTableWidget(0, 8)
-        self.search_table.setHorizontalHeaderLabels(["Artist", "Title", "BPM", "Key", "Energy", "Status", "Dupes", "Path"])
+        self.search_model = TrackTableModel(self)
+        self.search_table = QTableView()
+        self.search_table.setModel(self.search_model)
         self.search_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.search_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.search_table.selectionModel().currentRowChanged.connect(self._prewarm_preview)
         header = self.search_table.horizontalHeader()
         for column in range(7):
             header.setSectionResizeMode(column, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(7, QHeaderView.Stretch)
-
-        self.audio_output = QAudioOutput(self)
-        self.audio_output.setVolume(1.0)
-        self.media_player = QMediaPlayer(self)
-        self.media_player.setAudioOutput(self.audio_output)
-        self.media_player.errorOccurred.connect(self._on_preview_error)
+        # The model only formats the rows Qt asks for; keep sizing from asking
+        # for all of them. Columns fit the visible rows and every row has the
+        # same fixed height, so nothing is measured off screen.
+        header.setResizeContentsPrecision(0)
+        rows = self.search_table.verticalHeader()
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        rows.setDefaultSectionSize(self.search_table.fontMetrics().height() + 8)
+
+        # Created on first use by _player(): bringing up the audio backend is
+        # slow and most sessions never preview anything.
+        self.audio_output: QAudioOutput | None = None
+        self.media_player: QMediaPlayer | None = None
+        self._preview_starting = False
 
         self.preview_timer = QTimer(self)
         self.preview_timer.setSingleShot(True)
@@ -196,34 +352,36 @@ class LibraryTab(QWidget):
         self._refresh_stats()
         self._search()
 
-    def _search(self) -> None:
-        try:
-            tracks = services.search_library(
-                self.bpm_input.text(),
-                self.key_input.text(),
-                self.energy_input.text(),
-                self.query_input.text(),
-            )
-        except Exception as exc:
-            self._error(str(exc))
-            return
+    def _live_search(self) -> None:
+        self._search(live=True)
+
+    def _search(self, live: bool = False) -> None:
+        self._search_debounce.stop()
+        # Searches run on the thread pool; a newer search supersedes any still
+        # in flight, whose results are dropped when they arrive.
+        self._search_generation += 1
+        filters = (
+            self.bpm_input.text(),
+            self.key_input.text(),
+            self.energy_input.text(),
+            self.query_input.text(),
+        )
+        worker = Worker(services.search_library_with_duplicates, *filters)
+        worker.signals.finished.connect(partial(self._on_search_done, self._search_generation))
+        worker.signals.error.connect(partial(self._on_search_error, self._search_generation, live))
+        self.thread_pool.start(worker)
 
-        self.search_results = tracks
-        hash_counts = services.duplicate_hash_counts()
-
-        self.search_table.setRowCount(len(tracks))
-        for row, track in enumerate(tracks):
-            self.search_table.setItem(row, 0, QTableWidgetItem(track.artist))
-            self.search_table.setItem(row, 1, QTableWidgetItem(track.title))
-            self.search_table.setItem(row, 2, QTableWidgetItem(f"{track.bpm:.0f}"))
-            self.search_table.setItem(row, 3, QTableWidgetItem(track.musical_key))
-            self.search_table.setItem(row, 4, QTableWidgetItem(f"{track.energy_level:.2f}"))
-            status = "Online" if Path(track.file_path).exists() else "Missing"
-            self.search_table.setItem(row, 5, QTableWidgetItem(status))
-            duplicates = hash_counts.get(track.file_hash, 0)
-            dupe_text = f"x{duplicates}" if duplicates > 1 else ""
-            self.search_table.setItem(row, 6, QTableWidgetItem(dupe_text))
-            self.search_table.setItem(row, 7, QTableWidgetItem(track.file_path))
+    def _on_search_done(self, generation: int, result: tuple[list[Track], dict[str, int]]) -> None:
+        if generation != self._search_generation:
+            return
+        tracks, hash_counts = result
+        self.search_model.set_tracks(tracks, hash_counts)
+        if tracks:
+            # Checking files on disk can stall on slow or network volumes, so
+            # the Status column is filled in from a worker.
+            worker = Worker(services.existing_paths, [track.file_path for track in tracks])
+            worker.signals.finished.connect(partial(self.search_model.set_existing, tracks))
+            self.thread_pool.start(worker)
 
         if tracks:
             self.preview_status.setText(f"{len(tracks)} tracks loaded.")
@@ -231,6 +389,16 @@ class LibraryTab(QWidget):
             self.preview_status.setText("No tracks match this filter.")
             self._stop_preview(update_status=False)
 
+    def _on_search_error(self, generation: int, live: bool, trace: str) -> None:
+        if generation != self._search_generation:
+            return
+        if live:
+            # Half-typed filters (e.g. "17a") shouldn't pop a dialog.
+            message = trace.strip().splitlines()[-1] if trace.strip() else "unknown error"
+            self.preview_status.setText(f"Invalid filter: {message}")
+        else:
+            self._error(trace)
+
     def _refresh_stats(self) -> None:
         stats = services.compute_library_stats()
         if stats["total"] == 0:
@@ -252,10 +420,7 @@ class LibraryTab(QWidget):
         self._error(trace)
 
     def _selected_track(self):
-        row = self.search_table.currentRow()
-        if row < 0 or row >= len(self.search_results):
-            return None
-        return self.search_results[row]
+        return self.search_model.track(self.search_table.currentIndex().row())
 
     def _play_preview(self) -> None:
         track = self._selected_track()
@@ -270,19 +435,65 @@ class LibraryTab(QWidget):
 
         self._stop_preview(update_status=False)
 
-        self.media_player.setSource(QUrl.fromLocalFile(str(file_path)))
-        self.media_player.setPosition(int(max(track.preview_start, 0) * 1000))
-        self.media_player.play()
+        player = self._player()
+        source = QUrl.fromLocalFile(str(file_path))
+        if player.source() != source:
+            player.setSource(source)
+        player.setPosition(int(max(track.preview_start, 0) * 1000))
+        # The preview timer starts once audio is actually playing (see
+        # _on_playback_state), so slow buffering doesn't eat into the preview.
+        self._preview_starting = True
+        player.play()
 
-        self.preview_timer.start(self.preview_seconds * 1000)
         self.play_preview_btn.setEnabled(False)
         self.stop_preview_btn.setEnabled(True)
         self.preview_status.setText(f"Previewing: {track.artist} - {track.title}")
 
+    def _prewarm_preview(self, current: QModelIndex, _previous: QModelIndex) -> None:
+        """Load the newly selected track into the player ahead of Play Preview.
+
+        Opening the file and codec is what makes the first play slow, so it's
+        done while the user is still deciding. Skipped while a preview plays,
+        and for rows the existence check hasn't confirmed as online, so the GUI
+        thread never stats a file and a missing file doesn't start the player.
+        """
+        row = current.row()
+        track = self.search_model.track(row)
+        if (
+            track is None
+            or not self.search_model.is_online(row)
+            or self.preview_timer.isActive()
+            or self._preview_starting
+        ):
+            return
+        source = QUrl.fromLocalFile(track.file_path)
+        player = self._player()
+        if player.source() == source:
+            return
+        player.setSource(source)
+        player.setPosition(int(max(track.preview_start, 0) * 1000))
+
+    def _player(self) -> QMediaPlayer:
+        if self.media_player is None:
+            self.audio_output = QAudioOutput(self)
+            self.audio_output.setVolume(1.0)
+            self.media_player = QMediaPlayer(self)
+            self.media_player.setAudioOutput(self.audio_output)
+            self.media_player.errorOccurred.connect(self._on_preview_error)
+            self.media_player.playbackStateChanged.connect(self._on_playback_state)
+        return self.media_player
+
+    def _on_playback_state(self, state: QMediaPlayer.PlaybackState) -> None:
+        if state == QMediaPlayer.PlaybackState.PlayingState and self._preview_starting:
+            self._preview_starting = False
+            self.preview_timer.start(self.preview_seconds * 1000)
+
     def _stop_preview(self, update_status: bool = True) -> None:
+        self._preview_starting = False
         if self.preview_timer.isActive():
             self.preview_timer.stop()
-        self.media_player.stop()
+        if self.media_player is not None:
+            self.media_player.stop()
         self.play_preview_btn.setEnabled(True)
         self.stop_preview_btn.setEnabled(False)
         if update_status:
@@ -302,6 +513,7 @@ class PlanTab(QWidget):
         super().__init__()
         self.thread_pool = thread_pool
         self.on_set_changed = on_set_changed
+        self._pending_plan_name = ""
 
         root = QVBoxLayout(self)
 
@@ -344,12 +556,16 @@ class PlanTab(QWidget):
         self.plan_btn.setEnabled(False)
         self.status_label.setText("Planning with OpenAI...")
 
+        # Only one plan runs at a time (the button stays disabled until it
+        # finishes), so the name can wait on the tab for the result.
+        self._pending_plan_name = name
         worker = Worker(services.create_set_plan, description, name, duration)
-        worker.signals.finished.connect(partial(self._on_plan_done, name))
+        worker.signals.finished.connect(self._on_plan_done)
         worker.signals.error.connect(self._on_plan_error)
         self.thread_pool.start(worker)
 
-    def _on_plan_done(self, name: str, _result: object) -> None:
+    def _on_plan_done(self, _result: object) -> None:
+        name = self._pending_plan_name
         self.plan_btn.setEnabled(True)
         self.status_label.setText(f"Set '{name}' created.")
         self._load_preview(name)
@@ -362,25 +578,26 @@ class PlanTab(QWidget):
 
     def _load_preview(self, name: str) -> None:
         rows = services.get_set_tracks_detailed(name)
-        self.preview_table.setRowCount(len(rows))
-
-        for row, (set_track, track, transition) in enumerate(rows):
-            self.preview_table.setItem(row, 0, QTableWidgetItem(str(set_track.position)))
-            self.preview_table.setItem(row, 1, QTableWidgetItem(track.artist))
-            self.preview_table.setItem(row, 2, QTableWidgetItem(track.title))
-            self.preview_table.setItem(row, 3, QTableWidgetItem(f"{track.bpm:.0f}"))
-            self.preview_table.setItem(row, 4, QTableWidgetItem(track.musical_key))
-            self.preview_table.setItem(row, 5, QTableWidgetItem(f"{track.energy_level:.2f}"))
-            self.preview_table.setItem(row, 6, QTableWidgetItem(transition))
+        with _bulk_update(self.preview_table):
+            self.preview_table.setRowCount(len(rows))
+            for row, (set_track, track, transition) in enumerate(rows):
+                self.preview_table.setItem(row, 0, QTableWidgetItem(str(set_track.position)))
+                self.preview_table.setItem(row, 1, QTableWidgetItem(track.artist))
+                self.preview_table.setItem(row, 2, QTableWidgetItem(track.title))
+                self.preview_table.setItem(row, 3, QTableWidgetItem(f"{track.bpm:.0f}"))
+                self.preview_table.setItem(row, 4, QTableWidgetItem(track.musical_key))
+                self.preview_table.setItem(row, 5, QTableWidgetItem(f"{track.energy_level:.2f}"))
+                self.preview_table.setItem(row, 6, QTableWidgetItem(transition))
 
 
 class SetsTab(QWidget):
-    def __init__(self) -> None:
+    def __init__(self, set_names: QStringListModel) -> None:
         super().__init__()
 
         root = QVBoxLayout(self)
         top = QHBoxLayout()
         self.set_picker = QComboBox()
+        self.set_picker.setModel(set_names)
         refresh_btn = QPushButton("Refresh")
         load_btn = QPushButton("Load")
 
@@ -400,37 +617,31 @@ class SetsTab(QWidget):
         root.addWidget(self.table)
 
     def refresh_sets(self) -> None:
-        current = self.set_picker.currentText()
-        self.set_picker.clear()
-        for set_plan in services.list_sets():
-            self.set_picker.addItem(set_plan.name)
-        if current:
-            index = self.set_picker.findText(current)
-            if index >= 0:
-                self.set_picker.setCurrentIndex(index)
+        _sync_set_names(self.set_picker.model())
 
     def _load(self) -> None:
         name = self.set_picker.currentText().strip()
         rows = services.get_set_tracks_detailed(name)
-        self.table.setRowCount(len(rows))
-
-        for row, (set_track, track, transition) in enumerate(rows):
-            self.table.setItem(row, 0, QTableWidgetItem(str(set_track.position)))
-            self.table.setItem(row, 1, QTableWidgetItem(track.artist))
-            self.table.setItem(row, 2, QTableWidgetItem(track.title))
-            self.table.setItem(row, 3, QTableWidgetItem(f"{track.bpm:.0f}"))
-            self.table.setItem(row, 4, QTableWidgetItem(track.musical_key))
-            self.table.setItem(row, 5, QTableWidgetItem(f"{track.energy_level:.2f}"))
-            self.table.setItem(row, 6, QTableWidgetItem(transition))
+        with _bulk_update(self.table):
+            self.table.setRowCount(len(rows))
+            for row, (set_track, track, transition) in enumerate(rows):
+                self.table.setItem(row, 0, QTableWidgetItem(str(set_track.position)))
+                self.table.setItem(row, 1, QTableWidgetItem(track.artist))
+                self.table.setItem(row, 2, QTableWidgetItem(track.title))
+                self.table.setItem(row, 3, QTableWidgetItem(f"{track.bpm:.0f}"))
+                self.table.setItem(row, 4, QTableWidgetItem(track.musical_key))
+                self.table.setItem(row, 5, QTableWidgetItem(f"{track.energy_level:.2f}"))
+                self.table.setItem(row, 6, QTableWidgetItem(transition))
 
 
 class GapsTab(QWidget):
-    def __init__(self) -> None:
+    def __init__(self, set_names: QStringListModel) -> None:
         super().__init__()
 
         root = QVBoxLayout(self)
         top = QHBoxLayout()
         self.set_picker = QComboBox()
+        self.set_picker.setModel(set_names)
         self.analyze_btn = QPushButton("Analyze Gaps")
         self.analyze_btn.clicked.connect(self._analyze)
 
@@ -446,14 +657,7 @@ class GapsTab(QWidget):
         root.addWidget(self.table)
 
     def refresh_sets(self) -> None:
-        current = self.set_picker.currentText()
-        self.set_picker.clear()
-        for set_plan in services.list_sets():
-            self.set_picker.addItem(set_plan.name)
-        if current:
-            index = self.set_picker.findText(current)
-            if index >= 0:
-                self.set_picker.setCurrentIndex(index)
+        _sync_set_names(self.set_picker.model())
 
     def _analyze(self) -> None:
         name = self.set_picker.currentText().strip()
@@ -467,20 +671,21 @@ class GapsTab(QWidget):
             QMessageBox.critical(self, "DigCrate", str(exc))
             return
 
-        self.table.setRowCount(len(weak))
-        for row, transition in enumerate(weak):
-            gap_meta = gaps[row] if row < len(gaps) else None
-            self.table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
-            self.table.setItem(row, 1, QTableWidgetItem(transition.from_track.display_name))
-            self.table.setItem(row, 2, QTableWidgetItem(transition.to_track.display_name))
-            self.table.setItem(row, 3, QTableWidgetItem(f"{transition.score:.0%}"))
-            self.table.setItem(row, 4, QTableWidgetItem("; ".join(transition.issues)))
-            self.table.setItem(row, 5, QTableWidgetItem(f"{gap_meta.suggested_bpm:.0f}" if gap_meta else ""))
-            self.table.setItem(row, 6, QTableWidgetItem(gap_meta.suggested_key if gap_meta else ""))
+        with _bulk_update(self.table):
+            self.table.setRowCount(len(weak))
+            for row, transition in enumerate(weak):
+                gap_meta = gaps[row] if row < len(gaps) else None
+                self.table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
+                self.table.setItem(row, 1, QTableWidgetItem(transition.from_track.display_name))
+                self.table.setItem(row, 2, QTableWidgetItem(transition.to_track.display_name))
+                self.table.setItem(row, 3, QTableWidgetItem(f"{transition.score:.0%}"))
+                self.table.setItem(row, 4, QTableWidgetItem("; ".join(transition.issues)))
+                self.table.setItem(row, 5, QTableWidgetItem(f"{gap_meta.suggested_bpm:.0f}" if gap_meta else ""))
+                self.table.setItem(row, 6, QTableWidgetItem(gap_meta.suggested_key if gap_meta else ""))
 
 
 class DiscoverTab(QWidget):
-    def __init__(self, thread_pool: QThreadPool) -> None:
+    def __init__(self, thread_pool: QThreadPool, set_names: QStringListModel) -> None:
         super().__init__()
         self.thread_pool = thread_pool
 
@@ -488,6 +693,7 @@ class DiscoverTab(QWidget):
 
         controls = QGridLayout()
         self.set_picker = QComboBox()
+        self.set_picker.setModel(set_names)
         self.gap_picker = QComboBox()
         self.genre_input = QLineEdit()
         self.genre_input.setPlaceholderText("Optional genre")
@@ -522,14 +728,7 @@ class DiscoverTab(QWidget):
         root.addWidget(self.table)
 
     def refresh_sets(self) -> None:
-        current = self.set_picker.currentText()
-        self.set_picker.clear()
-        for set_plan in services.list_sets():
-            self.set_picker.addItem(set_plan.name)
-        if current:
-            index = self.set_picker.findText(current)
-            if index >= 0:
-                self.set_picker.setCurrentIndex(index)
+        _sync_set_names(self.set_picker.model())
         self._load_gaps()
 
     def _load_gaps(self) -> None:
@@ -570,14 +769,14 @@ class DiscoverTab(QWidget):
     def _on_discover_done(self, results: list[dict]) -> None:
         self.discover_btn.setEnabled(True)
         self.status_label.setText(f"Found {len(results)} suggestions")
-        self.table.setRowCount(len(results))
-
-        for row, result in enumerate(results):
-            self.table.setItem(row, 0, QTableWidgetItem(result.get("artist", "")))
-            self.table.setItem(row, 1, QTableWidgetItem(result.get("name", "")))
-            self.table.setItem(row, 2, QTableWidgetItem(f"{result.get('bpm', 0):.0f}"))
-            self.table.setItem(row, 3, QTableWidgetItem(f"{result.get('energy', 0):.2f}"))
-            self.table.setItem(row, 4, QTableWidgetItem(result.get("spotify_url", "")))
+        with _bulk_update(self.table):
+            self.table.setRowCount(len(results))
+            for row, result in enumerate(results):
+                self.table.setItem(row, 0, QTableWidgetItem(result.get("artist", "")))
+                self.table.setItem(row, 1, QTableWidgetItem(result.get("name", "")))
+                self.table.setItem(row, 2, QTableWidgetItem(f"{result.get('bpm', 0):.0f}"))
+                self.table.setItem(row, 3, QTableWidgetItem(f"{result.get('energy', 0):.2f}"))
+                self.table.setItem(row, 4, QTableWidgetItem(result.get("spotify_url", "")))
 
     def _on_discover_error(self, trace: str) -> None:
         self.discover_btn.setEnabled(True)
@@ -596,13 +795,14 @@ class DiscoverTab(QWidget):
 
 
 class ExportTab(QWidget):
-    def __init__(self) -> None:
+    def __init__(self, set_names: QStringListModel) -> None:
         super().__init__()
 
         root = QVBoxLayout(self)
 
         form = QFormLayout()
         self.set_picker = QComboBox()
+        self.set_picker.setModel(set_names)
         self.format_picker = QComboBox()
         self.format_picker.addItems(["m3u", "rekordbox"])
 
@@ -627,14 +827,7 @@ class ExportTab(QWidget):
         root.addLayout(form)
 
     def refresh_sets(self) -> None:
-        current = self.set_picker.currentText()
-        self.set_picker.clear()
-        for set_plan in services.list_sets():
-            self.set_picker.addItem(set_plan.name)
-        if current:
-            index = self.set_picker.findText(current)
-            if index >= 0:
-                self.set_picker.setCurrentIndex(index)
+        _sync_set_names(self.set_picker.model())
 
     def _pick_output(self) -> None:
         fmt = self.format_picker.currentText()
@@ -715,55 +908,56 @@ class PreferencesDialog(QDialog):
         self.accept()
 
 
+_STYLESHEET = """
+QWidget {
+    font-size: 13px;
+}
+QGroupBox {
+    font-weight: 600;
+    border: 1px solid palette(midlight);
+    border-radius: 10px;
+    margin-top: 10px;
+    padding: 8px 10px 10px 10px;
+}
+QGroupBox::title {
+    subcontrol-origin: margin;
+    left: 10px;
+    padding: 0 4px;
+}
+QPushButton {
+    padding: 6px 10px;
+    border-radius: 7px;
+}
+QLineEdit, QTextEdit, QComboBox, QSpinBox, QTableView {
+    border-radius: 7px;
+    padding: 4px;
+}
+QListWidget#sidebar {
+    border: none;
+    background: palette(window);
+    padding-top: 10px;
+    padding-left: 8px;
+    padding-right: 8px;
+}
+QListWidget#sidebar::item {
+    padding: 8px 10px;
+    margin: 2px 0px;
+    border-radius: 7px;
+}
+QListWidget#sidebar::item:selected {
+    background: palette(highlight);
+    color: palette(highlighted-text);
+}
+"""
+
+
 def _apply_platform_look(app: QApplication) -> None:
     if platform.system() == "Darwin":
         available_styles = {name.lower(): name for name in QStyleFactory.keys()}
         if "macintosh" in available_styles:
             app.setStyle(available_styles["macintosh"])
 
-    app.setStyleSheet(
-        """
-        QWidget {
-            font-size: 13px;
-        }
-        QGroupBox {
-            font-weight: 600;
-            border: 1px solid palette(midlight);
-            border-radius: 10px;
-            margin-top: 10px;
-            padding: 8px 10px 10px 10px;
-        }
-        QGroupBox::title {
-            subcontrol-origin: margin;
-            left: 10px;
-            padding: 0 4px;
-        }
-        QPushButton {
-            padding: 6px 10px;
-            border-radius: 7px;
-        }
-        QLineEdit, QTextEdit, QComboBox, QSpinBox, QTableWidget {
-            border-radius: 7px;
-            padding: 4px;
-        }
-        QListWidget#sidebar {
-            border: none;
-            background: palette(window);
-            padding-top: 10px;
-            padding-left: 8px;
-            padding-right: 8px;
-        }
-        QListWidget#sidebar::item {
-            padding: 8px 10px;
-            margin: 2px 0px;
-            border-radius: 7px;
-        }
-        QListWidget#sidebar::item:selected {
-            background: palette(highlight);
-            color: palette(highlighted-text);
-        }
-        """
-    )
+    app.setStyleSheet(_STYLESHEET)
 
 
 class DigCrateWindow(QMainWindow):
@@ -773,13 +967,19 @@ class DigCrateWindow(QMainWindow):
         self.resize(1320, 860)
 
         self.thread_pool = QThreadPool.globalInstance()
+        # Each pool thread keeps its own SQLite connection (with its prepared
+        # statement cache) via db.get_connection(); don't let idle threads
+        # expire and take those with them between searches.
+        self.thread_pool.setExpiryTimeout(-1)
 
         self.library_tab = LibraryTab(self.thread_pool)
         self.plan_tab = PlanTab(self.thread_pool, self.refresh_set_tabs)
-        self.sets_tab = SetsTab()
-        self.gaps_tab = GapsTab()
-        self.discover_tab = DiscoverTab(self.thread_pool)
-        self.export_tab = ExportTab()
+        # One list of set names shared by every tab's set picker.
+        self.set_names = QStringListModel(self)
+        self.sets_tab = SetsTab(self.set_names)
+        self.gaps_tab = GapsTab(self.set_names)
+        self.discover_tab = DiscoverTab(self.thread_pool, self.set_names)
+        self.export_tab = ExportTab(self.set_names)
 
         container = QSplitter()
         container.setChildrenCollapsible(False)
@@ -817,10 +1017,9 @@ class DigCrateWindow(QMainWindow):
         self.refresh_set_tabs()
 
     def refresh_set_tabs(self) -> None:
-        self.sets_tab.refresh_sets()
-        self.gaps_tab.refresh_sets()
+        # The pickers share one model, so a single sync updates all of them;
+        # Discover also reloads the gaps for its selected set.
         self.discover_tab.refresh_sets()
-        self.export_tab.refresh_sets()
 
     def _build_menu_bar(self) -> None:
         menu = self.menuBar()
@@ -2,27 +2,38 @@
 
 from __future__ import annotations
 
-from collections import OrderedDict
+import os
+import re
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterable
 
-from digcrate.analysis.analyzer import ANALYSIS_VERSION, analyze_track, file_hash
+from digcrate.analysis.analyzer import ANALYSIS_VERSION, analyze_track, analyze_tracks, file_hash, file_stat
 from digcrate.analysis.scanner import find_audio_files
 from digcrate.config import get_settings
 from digcrate.db import (
     delete_tracks_by_ids,
     delete_track_override,
+    file_hash_counts,
     get_all_sets,
-    get_all_tracks,
+    get_all_track_overrides,
     get_gaps,
     get_set_by_name,
-    get_set_tracks,
+    get_set_tracks_with_tracks,
     get_track_by_id,
     get_track_override,
-    get_track_by_path,
+    get_tracks_by_paths,
+    has_tracks,
+    key_histogram,
+    library_stats,
+    refresh_planner_stats,
+    reset_db_path,
     search_tracks,
+    set_track_file_stat,
     upsert_track_override,
     upsert_track,
+    upsert_tracks,
 )
 from digcrate.discovery.spotify import search_tracks as spotify_search
 from digcrate.export.m3u import export_m3u
@@ -33,21 +44,34 @@ from digcrate.planning.planner import plan_set
 from digcrate.planning.scoring import describe_transition
 
 
+_NUMBER = r"(\d+(?:\.\d*)?|\.\d+)"
+# "170", "170-175" or "170-"; a missing upper bound means low + default_span.
+_RANGE_RE = re.compile(rf"\s*{_NUMBER}\s*(?:-\s*{_NUMBER}?\s*)?")
+
+
 def _parse_range(value: str | None, default_span: float) -> tuple[float | None, float | None]:
-    if not value:
+    if not value or not value.strip():
         return None, None
 
-    parts = [p.strip() for p in value.split("-") if p.strip()]
-    if not parts:
-        return None, None
+    match = _RANGE_RE.fullmatch(value)
+    if not match:
+        raise ValueError(f"Invalid range: {value.strip()!r} (expected e.g. 170-175)")
 
-    low = float(parts[0])
-    high = float(parts[1]) if len(parts) > 1 else low + default_span
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else low + default_span
     return low, high
 
 
-def scan_directory(directory: str, progress_cb: Callable[[dict], None] | None = None) -> dict:
-    """Scan and analyze all audio files in a directory."""
+def scan_directory(
+    directory: str,
+    progress_cb: Callable[[dict], None] | None = None,
+    workers: int | None = None,
+) -> dict:
+    """Scan and analyze all audio files in a directory.
+
+    Unchanged files are skipped up front; the rest are analyzed in ``workers``
+    processes (default: CPU count) while results are written from this thread.
+    """
     dir_path = Path(directory).expanduser().resolve()
     if not dir_path.is_dir():
         raise ValueError(f"Not a directory: {dir_path}")
@@ -58,29 +82,55 @@ def scan_directory(directory: str, progress_cb: Callable[[dict], None] | None =
     analyzed = 0
     skipped = 0
     errors = 0
+    processed = 0
+    pending: list[Track] = []
 
-    for index, audio_file in enumerate(files, start=1):
+    def report(audio_file: Path) -> None:
+        nonlocal processed
+        processed += 1
         if progress_cb:
-            progress_cb({"current": index, "total": total, "name": audio_file.name})
-
-        existing = get_track_by_path(str(audio_file))
-        current_hash = file_hash(audio_file)
+            progress_cb({"current": processed, "total": total, "name": audio_file.name})
+
+    existing_by_path = get_tracks_by_paths(str(p) for p in files)
+    to_analyze: list[Path] = []
+    for audio_file in files:
+        # Skip if already analyzed and unchanged: an identical size/mtime avoids
+        # reading the file at all, otherwise the content hash decides.
+        existing = existing_by_path.get(str(audio_file))
         if (
             existing
-            and existing.file_hash == current_hash
             and (existing.title or "").strip()
             and existing.analysis_version >= ANALYSIS_VERSION
         ):
-            skipped += 1
-            continue
+            size, mtime_ns = file_stat(audio_file)
+            unchanged = bool(mtime_ns) and (existing.file_size, existing.file_mtime_ns) == (size, mtime_ns)
+            if not unchanged and existing.file_hash == file_hash(audio_file):
+                set_track_file_stat(existing.id, size, mtime_ns)
+                unchanged = True
+            if unchanged:
+                skipped += 1
+                report(audio_file)
+                continue
+        to_analyze.append(audio_file)
 
-        try:
-            track = analyze_track(audio_file)
-            track = _apply_track_override(track)
-            upsert_track(track)
-            analyzed += 1
-        except Exception:
+    overrides = get_all_track_overrides() if to_analyze else {}
+    for audio_file, result in analyze_tracks(to_analyze, workers=workers):
+        report(audio_file)
+        if isinstance(result, Exception):
             errors += 1
+            continue
+        pending.append(_apply_track_override(result, overrides))
+        analyzed += 1
+
+        if len(pending) >= 64:
+            upsert_tracks(pending)
+            pending.clear()
+
+    if pending:
+        upsert_tracks(pending)
+    if analyzed:
+        refresh_planner_stats()
+    _library_changed()
 
     return {
         "directory": str(dir_path),
@@ -103,7 +153,9 @@ def reanalyze_track(track_id: int) -> Track:
 
     track = analyze_track(path)
     track = _apply_track_override(track)
-    return upsert_track(track)
+    saved = upsert_track(track)
+    _library_changed()
+    return saved
 
 
 def save_track_override(
@@ -131,7 +183,9 @@ def save_track_override(
     else:
         refreshed = existing
     refreshed = _apply_track_override(refreshed)
-    return upsert_track(refreshed)
+    saved = upsert_track(refreshed)
+    _library_changed()
+    return saved
 
 
 def clear_track_override(track_id: int) -> Track:
@@ -148,7 +202,9 @@ def clear_track_override(track_id: int) -> Track:
     else:
         refreshed = existing.model_copy(update={"has_overrides": False})
     refreshed = refreshed.model_copy(update={"has_overrides": False})
-    return upsert_track(refreshed)
+    saved = upsert_track(refreshed)
+    _library_changed()
+    return saved
 
 
 def delete_tracks(track_ids: list[int]) -> dict[str, int]:
@@ -171,42 +227,29 @@ def delete_tracks(track_ids: list[int]) -> dict[str, int]:
             "cleared_gap_sets": 0,
         }
 
-    return delete_tracks_by_ids(normalized)
+    result = delete_tracks_by_ids(normalized)
+    _library_changed()
+    return result
 
 
+@lru_cache(maxsize=1)
 def compute_library_stats() -> dict:
-    tracks = get_all_tracks()
-    if not tracks:
-        return {
-            "total": 0,
-            "bpm_min": None,
-            "bpm_max": None,
-            "bpm_avg": None,
-            "energy_min": None,
-            "energy_max": None,
-            "energy_avg": None,
-            "duration_minutes": 0,
-            "top_keys": [],
-        }
-
-    bpms = [t.bpm for t in tracks if t.bpm > 0]
-    energies = [t.energy_level for t in tracks if t.energy_level > 0]
-    keys: dict[str, int] = {}
-
-    for track in tracks:
-        if track.musical_key:
-            keys[track.musical_key] = keys.get(track.musical_key, 0) + 1
+    """Summarize the library for the sidebar.
 
+    Cached until the library changes through one of these services; treat the
+    result as read-only.
+    """
+    stats = library_stats()
     return {
-        "total": len(tracks),
-        "bpm_min": min(bpms) if bpms else None,
-        "bpm_max": max(bpms) if bpms else None,
-        "bpm_avg": sum(bpms) / len(bpms) if bpms else None,
-        "energy_min": min(energies) if energies else None,
-        "energy_max": max(energies) if energies else None,
-        "energy_avg": sum(energies) / len(energies) if energies else None,
-        "duration_minutes": int(sum(t.duration for t in tracks) // 60),
-        "top_keys": sorted(keys.items(), key=lambda item: -item[1])[:10],
+        "total": stats["track_count"],
+        "bpm_min": stats["min_bpm"],
+        "bpm_max": stats["max_bpm"],
+        "bpm_avg": stats["avg_bpm"],
+        "energy_min": stats["min_energy"],
+        "energy_max": stats["max_energy"],
+        "energy_avg": stats["avg_energy"],
+        "duration_minutes": int(stats["total_duration"] // 60),
+        "top_keys": key_histogram(10),
     }
 
 
@@ -235,8 +278,26 @@ def search_library(
     return decorated
 
 
-def _apply_track_override(track: Track) -> Track:
-    override = get_track_override(track.file_path)
+def search_library_with_duplicates(
+    bpm_range: str | None,
+    key: str | None,
+    energy_range: str | None,
+    query: str | None,
+) -> tuple[list[Track], dict[str, int]]:
+    """Search the library and return the duplicate hash counts alongside."""
+    return search_library(bpm_range, key, energy_range, query), duplicate_hash_counts()
+
+
+def _apply_track_override(track: Track, overrides: dict[str, dict] | None = None) -> Track:
+    """Apply any manual override for the track's file.
+
+    ``overrides`` is a preloaded ``get_all_track_overrides()`` map for callers
+    applying many tracks; without it the override is looked up directly.
+    """
+    if overrides is None:
+        override = get_track_override(track.file_path)
+    else:
+        override = overrides.get(track.file_path)
     if not override:
         if track.has_overrides:
             return track.model_copy(update={"has_overrides": False})
@@ -269,12 +330,53 @@ def _decorate_review_state(track: Track) -> Track:
     return track.model_copy(update={"needs_review": True, "review_notes": combined})
 
 
+@lru_cache(maxsize=1)
 def duplicate_hash_counts() -> dict[str, int]:
-    """Return hash counts for duplicate detection across the full library."""
-    counts: dict[str, int] = {}
-    for track in get_all_tracks():
-        counts[track.file_hash] = counts.get(track.file_hash, 0) + 1
-    return counts
+    """Return hash counts for duplicate detection across the full library.
+
+    Cached until the library changes through one of these services; treat the
+    result as read-only.
+    """
+    return file_hash_counts()
+
+
+def _library_changed() -> None:
+    """Drop cached library-wide results after tracks were added, changed or removed."""
+    duplicate_hash_counts.cache_clear()
+    compute_library_stats.cache_clear()
+    _directory_names.cache_clear()
+
+
+def existing_paths(paths: Iterable[str]) -> set[str]:
+    """Return the subset of ``paths`` that exist on disk.
+
+    Lists each parent directory once instead of stat'ing every file, which is
+    much cheaper when many tracks share a folder (or live on a network mount).
+    """
+    names_by_dir: dict[str, list[str]] = defaultdict(list)
+    for path in paths:
+        directory, name = os.path.split(path)
+        names_by_dir[directory].append(name)
+
+    existing: set[str] = set()
+    for directory, names in names_by_dir.items():
+        try:
+            present = _directory_names(directory or ".", os.stat(directory or ".").st_mtime_ns)
+        except OSError:
+            continue
+        existing.update(os.path.join(directory, name) for name in names if name in present)
+    return existing
+
+
+@lru_cache(maxsize=4096)
+def _directory_names(directory: str, mtime_ns: int) -> frozenset[str]:
+    """List a directory, memoized on its mtime (which changes when entries do).
+
+    Live search re-checks the same folders on every refresh; with this each
+    unchanged folder costs one stat() instead of a full listing.
+    """
+    with os.scandir(directory) as entries:
+        return frozenset(entry.name for entry in entries)
 
 
 def create_set_plan(description: str, name: str, duration: int) -> SetPlan:
@@ -282,7 +384,7 @@ def create_set_plan(description: str, name: str, duration: int) -> SetPlan:
     if not settings.openai_api_key.strip():
         raise RuntimeError("OpenAI API key is missing. Open Preferences and set OPENAI_API_KEY.")
 
-    if not get_all_tracks():
+    if not has_tracks():
         raise RuntimeError("No tracks in library. Scan a music folder first.")
 
     try:
@@ -303,10 +405,7 @@ def get_set_tracks_detailed(name: str) -> list[tuple[SetTrack, Track, str]]:
         return []
 
     rows: list[tuple[SetTrack, Track, str]] = []
-    for set_track in get_set_tracks(set_plan.id):
-        track = get_track_by_id(set_track.track_id)
-        if track is None:
-            continue
+    for set_track, track in get_set_tracks_with_tracks(set_plan.id):
         transition_label = ""
         if set_track.position > 1:
             transition_label = f"{describe_transition(set_track.transition_score)} ({set_track.transition_score:.0%})"
@@ -369,6 +468,20 @@ def _env_file_path() -> Path:
 
 
 def load_preferences() -> dict[str, str]:
+    env_path = os.path.abspath(_env_file_path())
+    try:
+        st = os.stat(env_path)
+    except OSError:
+        return dict(_read_preferences(env_path, None))
+    return dict(_read_preferences(env_path, (st.st_mtime_ns, st.st_size)))
+
+
+@lru_cache(maxsize=4)
+def _read_preferences(env_path: str, stamp: tuple[int, int] | None) -> dict[str, str]:
+    """Parse ``.env``, memoized on its path and (mtime, size) stamp.
+
+    Warm reads cost one ``stat``, and edits made outside the app are picked up.
+    """
     defaults = {
         "OPENAI_API_KEY": "",
         "OPENAI_MODEL": "gpt-4o-mini",
@@ -377,38 +490,42 @@ def load_preferences() -> dict[str, str]:
         "DATABASE_PATH": "data/digcrate.sqlite",
     }
 
-    env_path = _env_file_path()
-    if not env_path.exists():
+    if stamp is None:
         return defaults
 
     values = defaults.copy()
-    for line in env_path.read_text(encoding="utf-8").splitlines():
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#") or "=" not in stripped:
-            continue
-        key, value = stripped.split("=", 1)
-        key = key.strip()
-        if key in values:
-            values[key] = value.strip()
+    with open(env_path, encoding="utf-8") as fh:
+        for line in fh:
+            stripped = line.strip()
+            if not stripped or stripped[0] == "#":
+                continue
+            key, sep, value = stripped.partition("=")
+            if not sep:
+                continue
+            key = key.strip()
+            if key in values:
+                values[key] = value.strip()
     return values
 
 
 def save_preferences(updates: dict[str, str]) -> Path:
     env_path = _env_file_path()
-    merged = OrderedDict(load_preferences())
+    current = load_preferences()
+    merged = OrderedDict(current)
     for key, value in updates.items():
         merged[key] = value.strip()
+    if merged == current and env_path.exists():
+        return env_path
 
     existing_other_lines: list[str] = []
     if env_path.exists():
-        for line in env_path.read_text(encoding="utf-8").splitlines():
-            stripped = line.strip()
-            if not stripped or stripped.startswith("#") or "=" not in stripped:
-                existing_other_lines.append(line)
-                continue
-            key = stripped.split("=", 1)[0].strip()
-            if key not in merged:
-                existing_other_lines.append(line)
+        with env_path.open(encoding="utf-8") as fh:
+            for raw in fh:
+                line = raw.rstrip("\r\n")
+                stripped = line.strip()
+                key, sep, _ = stripped.partition("=")
+                if not sep or stripped[0] == "#" or key.strip() not in merged:
+                    existing_other_lines.append(line)
 
     lines = [f"{key}={value}" for key, value in merged.items()]
     if existing_other_lines:
@@ -416,4 +533,7 @@ def save_preferences(updates: dict[str, str]) -> Path:
         lines.extend(existing_other_lines)
 
     env_path.write_text("\n".join(lines).rstrip() + "\n", encoding="utf-8")
+    _read_preferences.cache_clear()
+    reset_db_path()
+    _library_changed()
     return env_path
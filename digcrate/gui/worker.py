@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import traceback
+from functools import lru_cache
 from inspect import Parameter, Signature, signature
 from typing import Any, Callable
 
@@ -43,6 +44,20 @@ class Worker(QRunnable):
 
 def _accepts_progress_cb(fn: Callable[..., Any]) -> bool:
     """Return True when callable accepts a `progress_cb` kwarg."""
+    try:
+        return _accepts_progress_cb_cached(fn)
+    except TypeError:  # unhashable callable
+        return _inspect_progress_cb(fn)
+
+
+# Workers are mostly created for the same handful of service functions, so the
+# signature inspection is done once per callable.
+@lru_cache(maxsize=128)
+def _accepts_progress_cb_cached(fn: Callable[..., Any]) -> bool:
+    return _inspect_progress_cb(fn)
+
+
+def _inspect_progress_cb(fn: Callable[..., Any]) -> bool:
     try:
         sig: Signature = signature(fn)
     except Exception:
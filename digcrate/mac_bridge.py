@@ -218,7 +218,7 @@ def cmd_export(args: argparse.Namespace) -> None:
 
 
 def cmd_save_set(args: argparse.Namespace) -> None:
-    from digcrate.db import create_set, delete_set, get_track_by_id, set_set_tracks
+    from digcrate.db import create_set, delete_set, get_tracks_by_ids, set_set_tracks
     from digcrate.models import SetPlan, SetTrack
     from digcrate.planning.scoring import transition_score
 
@@ -234,10 +234,11 @@ def cmd_save_set(args: argparse.Namespace) -> None:
     if set_plan.id is None:
         _err("Failed to create set")
 
+    tracks = get_tracks_by_ids(track_ids)
     rows = []
     previous = None
     for idx, track_id in enumerate(track_ids, start=1):
-        track = get_track_by_id(track_id)
+        track = tracks.get(track_id)
         if track is None:
             continue
 
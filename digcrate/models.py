@@ -21,6 +21,8 @@ class Track(BaseModel):
     review_notes: str = ""
     has_overrides: bool = False
     analysis_version: int = 3
+    file_size: int = 0  # bytes, as of analysis
+    file_mtime_ns: int = 0
 
     @property
     def display_name(self) -> str:
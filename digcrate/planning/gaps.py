@@ -1,6 +1,6 @@
 """Identify weak transitions and missing tracks in a set."""
 
-from digcrate.db import get_gaps, get_set_tracks, get_track_by_id, set_gaps
+from digcrate.db import get_gaps, get_set_tracks, get_tracks_by_ids, set_gaps
 from digcrate.models import Gap, Track, TransitionInfo
 from digcrate.planning.scoring import transition_score
 
@@ -13,10 +13,11 @@ def analyze_gaps(set_id: int) -> list[TransitionInfo]:
     if len(set_tracks) < 2:
         return []
 
+    tracks = get_tracks_by_ids(st.track_id for st in set_tracks)
     weak_transitions = []
     for i in range(len(set_tracks) - 1):
-        track_a = get_track_by_id(set_tracks[i].track_id)
-        track_b = get_track_by_id(set_tracks[i + 1].track_id)
+        track_a = tracks.get(set_tracks[i].track_id)
+        track_b = tracks.get(set_tracks[i + 1].track_id)
         if not track_a or not track_b:
             continue
 
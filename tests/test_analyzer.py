@@ -7,18 +7,25 @@ import numpy as np
 
 from digcrate.analysis.analyzer import (
     ANALYSIS_VERSION,
+    _dedupe_tempos,
     _normalize_bpm,
+    _rotation_correlations,
     analyze_track,
+    analyze_tracks,
     classify_review_flags,
+    detect_bpm,
     detect_energy,
     detect_energy_with_confidence,
     detect_key,
     detect_preview_start,
     file_hash,
+    file_stat,
     parse_bpm_tag,
     parse_filename_metadata,
     parse_key_tag_to_camelot,
+    read_metadata,
 )
+from digcrate.models import Track
 
 
 def test_file_hash(tmp_path):
@@ -57,6 +64,57 @@ def test_detect_key_returns_camelot():
     assert key[:-1].isdigit()
 
 
+def test_file_stat(tmp_path):
+    test_file = tmp_path / "test.mp3"
+    test_file.write_bytes(b"x" * 100)
+
+    size, mtime_ns = file_stat(test_file)
+    assert size == 100
+    assert mtime_ns > 0
+    assert file_stat(tmp_path / "missing.mp3") == (0, 0)
+
+
+def test_file_hash_tracks_content_changes(tmp_path):
+    """Rewriting a file must not return the memoized digest of the old content."""
+    test_file = tmp_path / "track.mp3"
+    test_file.write_bytes(b"first version" * 100)
+    first = file_hash(test_file)
+
+    test_file.write_bytes(b"second, longer version" * 100)
+    assert file_hash(test_file) != first
+
+
+def test_rotation_correlations_match_corrcoef():
+    rng = np.random.default_rng(7)
+    chroma = rng.random(12)
+    profiles = rng.random((2, 12))
+
+    profiles_z = (profiles - profiles.mean(axis=1, keepdims=True)) / profiles.std(axis=1, keepdims=True)
+
+    correlations = _rotation_correlations(chroma, profiles_z)
+    assert correlations.shape == (12, 2)
+    for i in range(12):
+        rotated = np.roll(chroma, -i)
+        for j in range(2):
+            expected = np.corrcoef(rotated, profiles[j])[0, 1]
+            assert np.isclose(correlations[i, j], expected)
+
+    flat = _rotation_correlations(np.full(12, 1 / 12), profiles_z)
+    assert np.all(flat == 0.0)
+
+
+def test_detect_bpm_click_track():
+    """A plain four-on-the-floor click track should land on its tempo."""
+    sr = 22050
+    bpm = 128.0
+    y = np.random.default_rng(0).standard_normal(sr * 20).astype(np.float32) * 0.01
+    for beat in np.arange(0.0, 20.0, 60.0 / bpm):
+        start = int(beat * sr)
+        y[start:start + 400] += np.hanning(400).astype(np.float32) * 0.9
+
+    assert abs(detect_bpm(y, sr) - bpm) <= 2.0
+
+
 def test_detect_energy_range():
     """detect_energy should return a value between 0.0 and 1.0."""
     sr = 22050
@@ -122,6 +180,20 @@ def test_parse_filename_metadata_title_fallback():
 def test_normalize_bpm_handles_half_and_double_time():
     assert _normalize_bpm(62.0) == 124.0
     assert _normalize_bpm(256.0) == 128.0
+    assert _normalize_bpm(9999.0) == 9999.0 / 64
+    assert _normalize_bpm(17.5) == 70.0
+    assert _normalize_bpm(float("inf")) == 0.0
+
+
+def test_dedupe_tempos_keeps_first_of_each_cluster():
+    candidates = [128.0, 0.0, 172.0, 128.5, float("nan"), 86.0, 171.6, -5.0]
+    assert _dedupe_tempos(candidates) == [128.0, 172.0, 86.0]
+    assert _dedupe_tempos([]) == []
+
+
+def test_dedupe_tempos_compares_against_kept_values_only():
+    # 100.5 is dropped as a duplicate of 100, so it must not knock out 101.2.
+    assert _dedupe_tempos([100.0, 100.5, 101.2]) == [100.0, 101.2]
 
 
 def test_parse_bpm_tag_handles_common_formats():
@@ -139,6 +211,22 @@ def test_parse_key_tag_to_camelot_formats():
     assert parse_key_tag_to_camelot("not-a-key") == ""
 
 
+def test_read_metadata_vorbis_comments(tmp_path):
+    import soundfile as sf
+    from mutagen.flac import FLAC
+
+    path = tmp_path / "tagged.flac"
+    sf.write(path, np.zeros(2205, dtype=np.float32), 22050)
+    tags = FLAC(path)
+    tags["TITLE"] = "Even If"
+    tags["artist"] = "Calibre"
+    tags["BPM"] = "174"
+    tags["INITIALKEY"] = "Am"
+    tags.save()
+
+    assert read_metadata(path) == {"title": "Even If", "artist": "Calibre", "bpm": "174", "key": "Am"}
+
+
 def test_analyze_track_prefers_metadata_bpm_and_key():
     fake_audio = np.zeros(22050 * 4, dtype=np.float32)
     with (
@@ -191,3 +279,20 @@ def test_analyze_track_falls_back_to_signal_when_tags_invalid():
     assert track.artist == "Filename Artist"
     mock_detect_bpm.assert_called_once()
     mock_detect_key.assert_called_once()
+
+
+def test_analyze_tracks_reports_per_file_errors_in_process():
+    good = Path("/music/good.mp3")
+    bad = Path("/music/bad.mp3")
+    track = Track(file_path=str(good), file_hash="abc123", title="Good")
+
+    def fake_analyze(path: Path) -> Track:
+        if path == bad:
+            raise RuntimeError("decode failed")
+        return track
+
+    with patch("digcrate.analysis.analyzer.analyze_track", side_effect=fake_analyze):
+        results = dict(analyze_tracks([good, bad], workers=1))
+
+    assert results[good] is track
+    assert isinstance(results[bad], RuntimeError)
@@ -67,3 +67,10 @@ def test_key_compatibility_score():
 
     # Far away = 0.2
     assert key_compatibility_score("8A", "2A") == 0.2
+
+
+def test_key_compatibility_score_normalizes_spelling():
+    assert key_compatibility_score("8a", "08A") == 1.0
+    assert key_compatibility_score(" 12b", "1B") == 0.8
+    assert key_compatibility_score("8A", "not-a-key") == 0.5
+    assert compatible_keys("08a") == ["8A", "9A", "7A", "8B"]
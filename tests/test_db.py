@@ -0,0 +1,512 @@
+"""Tests for the SQLite layer against a temporary database."""
+
+import sqlite3
+
+import pytest
+
+from digcrate import db
+from digcrate.models import Gap, SetPlan, SetTrack, Track
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    path = tmp_path / "digcrate.sqlite"
+    monkeypatch.setenv("DATABASE_PATH", str(path))
+    db.close_connection()
+    db.reset_db_path()
+    yield path
+    db.close_connection()
+    db.reset_db_path()
+
+
+def _track(name: str, **fields) -> Track:
+    return Track(file_path=f"/music/{name}.mp3", file_hash=f"hash-{name}", title=name, **fields)
+
+
+def test_connection_is_reused_per_thread():
+    assert db.get_connection() is db.get_connection()
+
+
+def test_connection_uses_wal_journal():
+    conn = db.get_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
+@pytest.mark.parametrize(
+    ("sql", "index"),
+    [
+        ("SELECT * FROM tracks WHERE file_hash = 'x'", "idx_tracks_hash"),
+        ("SELECT * FROM set_tracks WHERE track_id IN (1, 2)", "idx_set_tracks_track"),
+        (
+            "SELECT * FROM tracks ORDER BY needs_review DESC, energy_confidence ASC, bpm",
+            "idx_tracks_review",
+        ),
+    ],
+)
+def test_queries_use_indexes(sql, index):
+    plan = db.get_connection().execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    assert any(index in row["detail"] for row in plan)
+
+
+def test_text_search_drives_from_full_text_index():
+    db.upsert_tracks(
+        _track(f"t{i}", artist="Calibre" if i % 50 == 0 else "Other", bpm=174.0, musical_key="8A")
+        for i in range(500)
+    )
+    db.refresh_planner_stats()
+
+    shape = (True, True, 1, False, False, "fts", False)
+    params = [170, 175, "8A", '"calibre"*']
+    plan = db.get_connection().execute(f"EXPLAIN QUERY PLAN {db._search_sql(shape)}", params).fetchall()
+    assert plan[0]["detail"].startswith("SCAN tracks_fts")
+    assert len(db.search_tracks(bpm_min=170, bpm_max=175, key="8A", query="calibre")) == 10
+
+
+def test_connection_follows_database_path_after_reset(tmp_path, monkeypatch):
+    first = db.get_connection()
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "other.sqlite"))
+    assert db.get_connection() is first
+
+    db.reset_db_path()
+    assert db.get_connection() is not first
+    assert (tmp_path / "other.sqlite").exists()
+
+
+def test_upsert_and_lookup_round_trip():
+    saved = db.upsert_track(_track("Even If", artist="Calibre", bpm=174.0, musical_key="8A"))
+    assert saved.id is not None
+
+    assert db.get_track_by_id(saved.id) == saved
+    assert db.get_track_by_path(saved.file_path) == saved
+    assert db.get_track_by_hash("hash-Even If") == saved
+
+    updated = db.upsert_track(saved.model_copy(update={"bpm": 172.0}))
+    assert updated.id == saved.id
+    assert db.get_track_by_id(saved.id).bpm == 172.0
+
+
+def test_upsert_tracks_writes_batch():
+    db.upsert_tracks([_track("a", bpm=120.0), _track("b", bpm=128.0)])
+    db.upsert_tracks([_track("a", bpm=122.0)])
+
+    tracks = {t.title: t for t in db.get_all_tracks()}
+    assert set(tracks) == {"a", "b"}
+    assert tracks["a"].bpm == 122.0
+
+
+def test_upsert_tracks_is_atomic():
+    db.upsert_track(_track("a", bpm=120.0))
+    broken = _track("b").model_copy(update={"file_hash": None})
+    with pytest.raises(sqlite3.IntegrityError):
+        db.upsert_tracks([_track("a", bpm=124.0), broken])
+
+    [track] = db.get_all_tracks()
+    assert track.bpm == 120.0
+    assert not db.get_connection().in_transaction
+    db.upsert_tracks([])
+
+
+def test_file_stat_is_stored_and_updated():
+    saved = db.upsert_track(_track("a", file_size=1024, file_mtime_ns=111))
+    assert (saved.file_size, saved.file_mtime_ns) == (1024, 111)
+
+    db.set_track_file_stat(saved.id, 2048, 222)
+    refreshed = db.get_track_by_id(saved.id)
+    assert (refreshed.file_size, refreshed.file_mtime_ns) == (2048, 222)
+
+
+def test_bulk_reads_build_typed_tracks():
+    db.upsert_track(_track("flagged", needs_review=True, review_notes="Low confidence", bpm=128.0))
+
+    [track] = db.get_all_tracks()
+    assert track.needs_review is True
+    assert track.has_overrides is False
+    assert track.review_reasons == ["Low confidence"]
+    assert db.search_tracks(needs_review=True) == [track]
+
+
+def test_search_filters_combine():
+    slow = db.upsert_track(_track("slow", bpm=120.0, energy_level=0.3, musical_key="8A"))
+    fast = db.upsert_track(_track("fast", bpm=174.0, energy_level=0.9, musical_key="8A"))
+    db.upsert_track(_track("other", bpm=174.0, energy_level=0.9, musical_key=" 9b"))
+
+    assert db.search_tracks(bpm_min=170, key="8A") == [fast]
+    first, second = db.search_tracks(key="8A")
+    assert first.musical_key is second.musical_key
+    assert db.search_tracks(bpm_max=130, energy_min=0.2, energy_max=0.5) == [slow]
+    assert db.search_tracks(bpm_min=100, query="fast") == [fast]
+    assert len(db.search_tracks()) == 3
+    assert [t.title for t in db.search_tracks(key="9B")] == ["other"]
+    assert sorted(t.title for t in db.search_tracks(key=["8A", "9B"], bpm_min=170)) == ["fast", "other"]
+    assert db.search_tracks(key=[]) == db.search_tracks()
+    three_keys = db.search_tracks(key=["8A", "9B", "1A"], bpm_min=170)
+    assert sorted(t.title for t in three_keys) == ["fast", "other"]
+    assert db.search_tracks(key=["1A", "2A", "3A", "9B", "4A"]) == db.search_tracks(key="9B")
+
+
+def test_search_query_matches_word_prefixes():
+    even_if = db.upsert_track(_track("Even If", artist="Calibre"))
+    majestic = db.upsert_track(_track("Mr. Majestic", artist="Break"))
+
+    assert db.search_tracks(query="calib") == [even_if]
+    assert db.search_tracks(query='eve "if') == [even_if]
+    # No indexable words: falls back to a substring match.
+    assert db.search_tracks(query=".") == [majestic]
+
+    assert db.search_tracks(query='"even if"') == [even_if]
+    assert db.search_tracks(query='"if even"') == []
+    assert db.search_tracks(query="even OR nothing") == []
+
+    db.upsert_track(even_if.model_copy(update={"title": "Renamed"}))
+    assert db.search_tracks(query="even") == []
+    db.delete_tracks_by_ids([even_if.id])
+    assert db.search_tracks(query="calibre") == []
+
+
+def test_search_query_ignores_accents_and_handles_cjk():
+    beyonce = db.upsert_track(_track("Halo", artist="Beyoncé"))
+    kyoto = db.upsert_track(_track("京都の夜", artist="Tycho"))
+
+    assert db.search_tracks(query="beyonce") == [beyonce]
+    assert db.search_tracks(query="BEYONCÉ") == [beyonce]
+    assert db.search_tracks(query="都の") == [kyoto]
+
+
+# The tracks table as created before the review and file-stat columns existed.
+_LEGACY_TRACKS_DDL = """
+CREATE TABLE tracks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_path TEXT UNIQUE NOT NULL,
+    file_hash TEXT NOT NULL,
+    title TEXT DEFAULT '',
+    artist TEXT DEFAULT '',
+    bpm REAL DEFAULT 0.0,
+    musical_key TEXT DEFAULT '',
+    energy_level REAL DEFAULT 0.0,
+    duration REAL DEFAULT 0.0
+);
+"""
+
+
+def test_legacy_database_without_review_columns_is_migrated(tmp_path, monkeypatch):
+    legacy = tmp_path / "legacy.sqlite"
+    conn = sqlite3.connect(legacy)
+    conn.executescript(_LEGACY_TRACKS_DDL)
+    conn.execute(
+        "INSERT INTO tracks (file_path, file_hash, title, bpm) VALUES (?, ?, ?, ?)",
+        ("/music/old.mp3", "abc", "Old", 174.0),
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setenv("DATABASE_PATH", str(legacy))
+    db.reset_db_path()
+
+    [track] = db.search_tracks()
+    assert (track.title, track.needs_review, track.energy_confidence) == ("Old", False, 1.0)
+    indexes = {row[0] for row in db.get_connection().execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_tracks_review" in indexes
+
+
+def test_full_text_index_rebuilt_with_current_tokenizer(tmp_path, monkeypatch):
+    legacy = tmp_path / "legacy.sqlite"
+    conn = sqlite3.connect(legacy)
+    conn.executescript(db.SCHEMA)
+    conn.executescript(db.FTS_SCHEMA.replace("remove_diacritics 2", "remove_diacritics 0"))
+    conn.execute(
+        "INSERT INTO tracks (file_path, file_hash, title, artist) VALUES (?, ?, ?, ?)",
+        ("/music/halo.mp3", "abc", "Halo", "Beyoncé"),
+    )
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+    monkeypatch.setenv("DATABASE_PATH", str(legacy))
+    db.reset_db_path()
+
+    assert [t.title for t in db.search_tracks(query="beyonce")] == ["Halo"]
+
+
+def test_full_text_index_backfills_existing_tracks(tmp_path, monkeypatch):
+    legacy = tmp_path / "legacy.sqlite"
+    conn = sqlite3.connect(legacy)
+    conn.executescript(db.SCHEMA)
+    conn.execute(
+        "INSERT INTO tracks (file_path, file_hash, title, artist) VALUES (?, ?, ?, ?)",
+        ("/music/even-if.mp3", "abc", "Even If", "Calibre"),
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setenv("DATABASE_PATH", str(legacy))
+    db.reset_db_path()
+
+    assert [t.title for t in db.search_tracks(query="calibre")] == ["Even If"]
+
+
+def test_schema_is_prepared_once_per_path(monkeypatch):
+    db.get_connection()
+    db.close_connection()
+    monkeypatch.setattr(db, "_prepare_schema", lambda conn: pytest.fail("schema re-run"))
+
+    assert db.get_connection().execute("SELECT COUNT(*) FROM tracks").fetchone()[0] == 0
+
+
+def test_schema_is_recreated_when_the_file_is_replaced(temp_db):
+    db.upsert_track(_track("one"))
+    db.close_connection()
+    temp_db.unlink()
+    for suffix in ("-wal", "-shm"):
+        temp_db.with_name(temp_db.name + suffix).unlink(missing_ok=True)
+
+    assert db.get_connection().execute("SELECT COUNT(*) FROM tracks").fetchone()[0] == 0
+
+
+def test_versioned_database_skips_migrations(temp_db, monkeypatch):
+    assert db.get_connection().execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION
+    db.close_connection()
+    # Simulate a fresh process opening an already-migrated database.
+    monkeypatch.setattr(db, "_schema_ready", {})
+    monkeypatch.setattr(db, "_ensure_track_columns", lambda conn: pytest.fail("migration re-run"))
+
+    db.upsert_track(_track("Even If", artist="Calibre"))
+    assert [t.title for t in db.search_tracks(query="calibre")] == ["Even If"]
+
+
+def test_track_lookups_are_refreshed_after_writes():
+    assert db.get_track_by_path("/music/new.mp3") is None
+
+    saved = db.upsert_track(_track("new", bpm=120.0))
+    assert db.get_track_by_path(saved.file_path) == saved
+    assert db.get_track_by_id(saved.id) is db.get_track_by_id(saved.id)
+
+    db.upsert_tracks([saved.model_copy(update={"bpm": 124.0})])
+    assert db.get_track_by_id(saved.id).bpm == 124.0
+
+    db.set_track_file_stat(saved.id, 10, 20)
+    assert db.get_track_by_path(saved.file_path).file_size == 10
+
+    db.delete_tracks_by_ids([saved.id])
+    assert db.get_track_by_id(saved.id) is None
+
+
+def test_get_tracks_by_ids_skips_unknown_ids():
+    first = db.upsert_track(_track("one"))
+    second = db.upsert_track(_track("two"))
+
+    assert db.get_tracks_by_ids([second.id, 999, first.id, second.id]) == {
+        first.id: first,
+        second.id: second,
+    }
+    assert db.get_tracks_by_ids([]) == {}
+
+
+def test_get_tracks_by_paths_skips_unknown_paths():
+    first = db.upsert_track(_track("one"))
+    second = db.upsert_track(_track("two"))
+
+    paths = [second.file_path, "/missing.mp3", first.file_path, second.file_path]
+    assert db.get_tracks_by_paths(paths) == {
+        first.file_path: first,
+        second.file_path: second,
+    }
+    assert db.get_tracks_by_paths([]) == {}
+
+
+def test_file_hash_counts_groups_by_hash():
+    assert db.file_hash_counts() == {}
+    db.upsert_track(Track(file_path="/music/a.mp3", file_hash="same"))
+    db.upsert_track(Track(file_path="/music/b.mp3", file_hash="same"))
+    db.upsert_track(Track(file_path="/music/c.mp3", file_hash="other"))
+
+    assert db.file_hash_counts() == {"same": 2, "other": 1}
+
+
+def test_library_stats_and_key_histogram():
+    assert db.has_tracks() is False
+    empty = db.library_stats()
+    assert empty["track_count"] == 0
+    assert empty["avg_bpm"] is None
+    assert empty["total_duration"] == 0
+
+    db.upsert_tracks([
+        _track("a", bpm=170.0, energy_level=0.8, musical_key="8A", duration=300.0),
+        _track("b", bpm=174.0, energy_level=0.6, musical_key="8A", duration=240.0),
+        _track("c", musical_key="9A", duration=60.0),
+    ])
+
+    assert db.has_tracks() is True
+    stats = db.library_stats()
+    assert stats["track_count"] == 3
+    assert (stats["min_bpm"], stats["max_bpm"], stats["avg_bpm"]) == (170.0, 174.0, 172.0)
+    assert stats["avg_energy"] == pytest.approx(0.7)
+    assert stats["total_duration"] == 600.0
+    assert db.key_histogram() == [("8A", 2), ("9A", 1)]
+    assert db.key_histogram(limit=1) == [("8A", 2)]
+
+
+def _scanned_stats() -> tuple[dict, list[tuple[str, int]]]:
+    """Recompute library_stats/key_histogram the slow way, straight from tracks."""
+    tracks = db.get_all_tracks()
+    bpms = [t.bpm for t in tracks if t.bpm > 0]
+    energies = [t.energy_level for t in tracks if t.energy_level > 0]
+    keys: dict[str, int] = {}
+    for t in tracks:
+        if t.musical_key:
+            keys[t.musical_key] = keys.get(t.musical_key, 0) + 1
+    stats = {
+        "track_count": len(tracks),
+        "min_bpm": min(bpms, default=None),
+        "max_bpm": max(bpms, default=None),
+        "avg_bpm": sum(bpms) / len(bpms) if bpms else None,
+        "min_energy": min(energies, default=None),
+        "max_energy": max(energies, default=None),
+        "avg_energy": sum(energies) / len(energies) if energies else None,
+        "total_duration": sum(t.duration for t in tracks),
+    }
+    return stats, sorted(keys.items(), key=lambda item: (-item[1], item[0]))
+
+
+def test_library_stats_follow_updates_and_deletes():
+    a = db.upsert_track(_track("a", bpm=170.0, energy_level=0.8, musical_key="8A", duration=300.0))
+    b = db.upsert_track(_track("b", bpm=128.0, energy_level=0.5, musical_key="8A", duration=200.0))
+    db.upsert_track(_track("c", bpm=140.0, musical_key="2B", duration=100.0))
+
+    db.upsert_track(b.model_copy(update={"bpm": 0.0, "musical_key": "2B", "duration": 250.0}))
+    db.delete_tracks_by_ids([a.id])
+
+    expected_stats, expected_keys = _scanned_stats()
+    assert db.library_stats() == pytest.approx(expected_stats)
+    assert db.key_histogram() == expected_keys == [("2B", 2)]
+
+    db.delete_tracks_by_ids([t.id for t in db.get_all_tracks()])
+    stats = db.library_stats()
+    assert (stats["track_count"], stats["avg_bpm"], stats["total_duration"]) == (0, None, 0.0)
+    assert db.key_histogram() == []
+
+
+def test_library_stats_are_backfilled_on_upgrade(tmp_path, monkeypatch):
+    legacy = tmp_path / "legacy.sqlite"
+    conn = sqlite3.connect(legacy)
+    conn.executescript(db.SCHEMA)
+    conn.executemany(
+        "INSERT INTO tracks (file_path, file_hash, bpm, musical_key, duration) VALUES (?, ?, ?, ?, ?)",
+        [("/music/a.mp3", "a", 170.0, "8A", 60.0), ("/music/b.mp3", "b", 0.0, "8A", 30.0)],
+    )
+    conn.execute("PRAGMA user_version = 2")
+    conn.commit()
+    conn.close()
+    monkeypatch.setenv("DATABASE_PATH", str(legacy))
+    db.reset_db_path()
+
+    stats = db.library_stats()
+    assert (stats["track_count"], stats["avg_bpm"], stats["total_duration"]) == (2, 170.0, 90.0)
+    assert db.key_histogram() == [("8A", 2)]
+
+
+def test_get_set_tracks_with_tracks_joins_in_order():
+    first = db.upsert_track(_track("one", bpm=170.0))
+    second = db.upsert_track(_track("two", bpm=172.0))
+    set_plan = db.create_set(SetPlan(name="Warmup"))
+    entries = [
+        SetTrack(set_id=set_plan.id, track_id=second.id, position=1),
+        SetTrack(set_id=set_plan.id, track_id=first.id, position=2, transition_score=0.8),
+    ]
+    db.set_set_tracks(set_plan.id, entries)
+
+    assert db.get_set_tracks_with_tracks(set_plan.id) == list(zip(entries, [second, first]))
+
+
+def test_failed_set_track_write_rolls_back():
+    first = db.upsert_track(_track("one"))
+    second = db.upsert_track(_track("two"))
+    set_plan = db.create_set(SetPlan(name="Warmup"))
+    original = [SetTrack(set_id=set_plan.id, track_id=first.id, position=0)]
+    db.set_set_tracks(set_plan.id, original)
+
+    clashing = [
+        SetTrack(set_id=set_plan.id, track_id=first.id, position=0),
+        SetTrack(set_id=set_plan.id, track_id=second.id, position=0),
+    ]
+    with pytest.raises(sqlite3.IntegrityError):
+        db.set_set_tracks(set_plan.id, clashing)
+
+    assert db.get_set_tracks(set_plan.id) == original
+
+
+def test_set_gaps_replaces_previous_rows():
+    set_plan = db.create_set(SetPlan(name="Peak"))
+    db.set_gaps(set_plan.id, [Gap(set_id=set_plan.id, position=1), Gap(set_id=set_plan.id, position=2)])
+    db.set_gaps(set_plan.id, [Gap(set_id=set_plan.id, position=3, suggested_key="8A")])
+
+    gaps = db.get_gaps(set_plan.id)
+    assert [(g.position, g.suggested_key) for g in gaps] == [(3, "8A")]
+
+
+def test_delete_set_removes_entries_and_gaps():
+    track = db.upsert_track(_track("one"))
+    set_plan = db.create_set(SetPlan(name="Warmup"))
+    db.set_set_tracks(set_plan.id, [SetTrack(set_id=set_plan.id, track_id=track.id, position=1)])
+    db.set_gaps(set_plan.id, [Gap(set_id=set_plan.id, position=1)])
+
+    assert db.delete_set("Warmup") is True
+    assert db.get_set_by_name("Warmup") is None
+    assert db.get_set_tracks(set_plan.id) == []
+    assert db.get_gaps(set_plan.id) == []
+    assert db.delete_set("Warmup") is False
+
+
+def test_get_all_track_overrides_keys_by_path():
+    assert db.get_all_track_overrides() == {}
+    db.upsert_track_override("/music/a.mp3", bpm=128.0)
+    db.upsert_track_override("/music/b.mp3", musical_key="8A")
+
+    overrides = db.get_all_track_overrides()
+    assert set(overrides) == {"/music/a.mp3", "/music/b.mp3"}
+    assert overrides["/music/a.mp3"] == db.get_track_override("/music/a.mp3")
+    assert overrides["/music/b.mp3"]["musical_key"] == "8A"
+
+
+def test_delete_tracks_by_ids_cleans_up_dependents():
+    first = db.upsert_track(_track("one"))
+    second = db.upsert_track(_track("two"))
+    db.upsert_track_override(first.file_path, bpm=128.0)
+    set_plan = db.create_set(SetPlan(name="Warmup"))
+    db.set_set_tracks(set_plan.id, [
+        SetTrack(set_id=set_plan.id, track_id=first.id, position=1),
+        SetTrack(set_id=set_plan.id, track_id=second.id, position=2),
+        SetTrack(set_id=set_plan.id, track_id=first.id, position=3),
+    ])
+    db.set_gaps(set_plan.id, [Gap(set_id=set_plan.id, position=1)])
+
+    result = db.delete_tracks_by_ids([first.id, 999])
+
+    assert result == {
+        "requested": 2,
+        "deleted": 1,
+        "missing": 1,
+        "removed_from_sets": 2,
+        "cleared_gap_sets": 1,
+    }
+    assert [st.track_id for st in db.get_set_tracks(set_plan.id)] == [second.id]
+    assert db.get_gaps(set_plan.id) == []
+    assert db.get_track_override(first.file_path) is None
+    assert db.delete_tracks_by_ids([first.id])["missing"] == 1
+
+
+def test_set_and_gap_lookups_are_refreshed_after_writes():
+    assert db.get_all_sets() == []
+    set_plan = db.create_set(SetPlan(name="warmup"))
+    assert db.get_set_by_name("warmup") is db.get_set_by_name("warmup")
+    assert db.get_all_sets() == [set_plan]
+
+    db.set_gaps(set_plan.id, [Gap(set_id=set_plan.id, position=1, suggested_bpm=124.0)])
+    [gap] = db.get_gaps(set_plan.id)
+    assert gap.suggested_bpm == 124.0
+
+    track = db.upsert_track(_track("a"))
+    db.set_set_tracks(set_plan.id, [SetTrack(set_id=set_plan.id, track_id=track.id, position=1)])
+    db.delete_tracks_by_ids([track.id])
+    assert db.get_gaps(set_plan.id) == []
+
+    db.delete_set("warmup")
+    assert db.get_set_by_name("warmup") is None
+    assert db.get_all_sets() == []
@@ -0,0 +1,66 @@
+"""Tests for playlist exporters against a temporary database."""
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from digcrate import db
+from digcrate.export.m3u import export_m3u
+from digcrate.export.rekordbox import export_rekordbox
+from digcrate.models import SetPlan, SetTrack, Track
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "digcrate.sqlite"))
+    db.close_connection()
+    db.reset_db_path()
+    yield
+    db.close_connection()
+    db.reset_db_path()
+
+
+@pytest.fixture
+def saved_set():
+    opener = db.upsert_track(Track(
+        file_path="/music/opener.mp3", file_hash="a", title="Opener", artist="Alix Perez & <Friends>",
+        bpm=172.0, musical_key="8A", duration=301.5,
+    ))
+    closer = db.upsert_track(Track(file_path="/music/closer.flac", file_hash="b", bpm=174.0, musical_key="9A"))
+    set_plan = db.create_set(SetPlan(name="Late Night"))
+    db.set_set_tracks(set_plan.id, [
+        SetTrack(set_id=set_plan.id, track_id=opener.id, position=1),
+        SetTrack(set_id=set_plan.id, track_id=closer.id, position=2, transition_score=0.8),
+    ])
+    return set_plan
+
+
+def test_export_m3u_writes_tracks_in_set_order(saved_set, tmp_path):
+    output = export_m3u(saved_set.name, str(tmp_path / "set.m3u"))
+
+    assert (tmp_path / "set.m3u").read_text(encoding="utf-8").splitlines() == [
+        "#EXTM3U",
+        "#PLAYLIST:Late Night",
+        "#EXTINF:301,Alix Perez & <Friends> - Opener",
+        "/music/opener.mp3",
+        "#EXTINF:0,closer",
+        "/music/closer.flac",
+    ]
+    assert output == str(tmp_path / "set.m3u")
+
+
+def test_export_rekordbox_lists_collection_and_playlist(saved_set, tmp_path):
+    export_rekordbox(saved_set.name, str(tmp_path / "set.xml"))
+
+    root = ET.parse(tmp_path / "set.xml").getroot()
+    tracks = root.findall("./COLLECTION/TRACK")
+    assert [t.get("Name") for t in tracks] == ["Opener", "closer"]
+    assert tracks[0].get("Artist") == "Alix Perez & <Friends>"
+    assert [t.get("Tonality") for t in tracks] == ["8A", "9A"]
+    assert tracks[0].get("Location") == "file://localhost/music/opener.mp3"
+    assert [t.get("Key") for t in root.findall("./PLAYLISTS/NODE/NODE/TRACK")] == ["1", "2"]
+
+
+def test_export_unknown_set_returns_none(tmp_path):
+    assert export_m3u("Missing", str(tmp_path / "x.m3u")) is None
+    assert export_rekordbox("Missing", str(tmp_path / "x.xml")) is None
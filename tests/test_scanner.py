@@ -0,0 +1,37 @@
+"""Tests for audio file discovery."""
+
+import pytest
+
+from digcrate.analysis.scanner import find_audio_files
+
+
+def test_find_audio_files_walks_tree_sorted(tmp_path):
+    (tmp_path / "b" / "deep").mkdir(parents=True)
+    (tmp_path / "a").mkdir()
+    for rel in ("b/deep/two.FLAC", "a/one.mp3", "top.wav", "a/cover.jpg", "a/.mp3", "b/notes"):
+        (tmp_path / rel).write_bytes(b"")
+
+    found = find_audio_files(tmp_path, sort=True)
+
+    assert [p.relative_to(tmp_path).as_posix() for p in found] == [
+        "a/one.mp3",
+        "b/deep/two.FLAC",
+        "top.wav",
+    ]
+
+
+def test_find_audio_files_parallel_walk_matches_serial(tmp_path):
+    expected = []
+    for i in range(8):
+        nested = tmp_path / f"artist{i}" / "album"
+        nested.mkdir(parents=True)
+        for name in ("01.mp3", "02.m4a", "folder.jpg"):
+            (nested / name).write_bytes(b"")
+        expected += [nested / "01.mp3", nested / "02.m4a"]
+
+    assert sorted(find_audio_files(tmp_path)) == sorted(expected)
+
+
+def test_find_audio_files_rejects_missing_directory(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        find_audio_files(tmp_path / "missing")
@@ -0,0 +1,154 @@
+"""Tests for GUI service helpers that don't need Qt."""
+
+import pytest
+
+from digcrate import db
+from digcrate.gui import services
+from digcrate.models import SetPlan, SetTrack, Track
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "digcrate.sqlite"))
+    db.close_connection()
+    db.reset_db_path()
+    services.duplicate_hash_counts.cache_clear()
+    services.compute_library_stats.cache_clear()
+    yield
+    services.duplicate_hash_counts.cache_clear()
+    services.compute_library_stats.cache_clear()
+    db.close_connection()
+    db.reset_db_path()
+
+
+def test_existing_paths_lists_each_folder(tmp_path):
+    (tmp_path / "a").mkdir()
+    present = tmp_path / "a" / "one.mp3"
+    present.write_bytes(b"")
+    (tmp_path / "b.wav").write_bytes(b"")
+
+    paths = [
+        str(present),
+        str(tmp_path / "a" / "gone.mp3"),
+        str(tmp_path / "b.wav"),
+        str(tmp_path / "missing-dir" / "c.flac"),
+    ]
+    assert services.existing_paths(paths) == {str(present), str(tmp_path / "b.wav")}
+    assert services.existing_paths([]) == set()
+
+    present.unlink()
+    (tmp_path / "a" / "gone.mp3").write_bytes(b"")
+    assert services.existing_paths(paths[:2]) == {str(tmp_path / "a" / "gone.mp3")}
+
+
+def test_duplicate_hash_counts_refresh_after_library_changes():
+    first = db.upsert_track(Track(file_path="/music/a.mp3", file_hash="same"))
+    db.upsert_track(Track(file_path="/music/b.mp3", file_hash="same"))
+    assert services.duplicate_hash_counts() == {"same": 2}
+    assert services.duplicate_hash_counts() is services.duplicate_hash_counts()
+
+    services.delete_tracks([first.id])
+    assert services.duplicate_hash_counts() == {"same": 1}
+
+
+def test_scan_skips_unchanged_files_without_hashing(tmp_path, monkeypatch):
+    music = tmp_path / "music"
+    music.mkdir()
+    audio = music / "a.mp3"
+    audio.write_bytes(b"audio")
+    size, mtime_ns = services.file_stat(audio)
+
+    def no_hash(path):
+        raise AssertionError("unchanged file was hashed")
+
+    monkeypatch.setattr(services, "file_hash", no_hash)
+    monkeypatch.setattr(services, "analyze_tracks", lambda paths, workers=None: iter(()))
+    db.upsert_track(Track(
+        file_path=str(audio.resolve()),
+        file_hash="abc",
+        title="A",
+        analysis_version=services.ANALYSIS_VERSION,
+        file_size=size,
+        file_mtime_ns=mtime_ns,
+    ))
+    result = services.scan_directory(str(music))
+    assert (result["skipped"], result["analyzed"]) == (1, 0)
+
+
+def test_library_stats_refresh_after_library_changes():
+    first = db.upsert_track(Track(file_path="/music/a.mp3", file_hash="a", bpm=120.0, musical_key="8A"))
+    db.upsert_track(Track(file_path="/music/b.mp3", file_hash="b", bpm=128.0, musical_key="8A"))
+    stats = services.compute_library_stats()
+    assert (stats["total"], stats["bpm_min"], stats["bpm_max"]) == (2, 120.0, 128.0)
+    assert stats["top_keys"] == [("8A", 2)]
+    assert services.compute_library_stats() is stats
+
+    services.delete_tracks([first.id])
+    stats = services.compute_library_stats()
+    assert (stats["total"], stats["bpm_min"], stats["top_keys"]) == (1, 128.0, [("8A", 1)])
+
+
+def test_get_set_tracks_detailed_labels_transitions():
+    first = db.upsert_track(Track(file_path="/music/a.mp3", file_hash="a"))
+    second = db.upsert_track(Track(file_path="/music/b.mp3", file_hash="b"))
+    set_plan = db.create_set(SetPlan(name="Warmup"))
+    db.set_set_tracks(set_plan.id, [
+        SetTrack(set_id=set_plan.id, track_id=first.id, position=1),
+        SetTrack(set_id=set_plan.id, track_id=second.id, position=2, transition_score=0.9),
+    ])
+
+    rows = services.get_set_tracks_detailed("Warmup")
+    assert [(track.id, label) for _, track, label in rows] == [
+        (first.id, ""),
+        (second.id, f"{services.describe_transition(0.9)} (90%)"),
+    ]
+    assert services.get_set_tracks_detailed("Missing") == []
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("", (None, None)),
+        ("  ", (None, None)),
+        ("170", (170.0, 175.0)),
+        ("170-", (170.0, 175.0)),
+        (" 170 - 174.5 ", (170.0, 174.5)),
+        (".6-.8", (0.6, 0.8)),
+    ],
+)
+def test_parse_range(value, expected):
+    assert services._parse_range(value, 5.0) == expected
+
+
+@pytest.mark.parametrize("value", ["abc", "170-175-180", "1.2.3", "-"])
+def test_parse_range_rejects_malformed_input(value):
+    with pytest.raises(ValueError):
+        services._parse_range(value, 5.0)
+
+
+def test_preferences_are_cached_until_changed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    services._read_preferences.cache_clear()
+    try:
+        (tmp_path / ".env").write_text("OPENAI_MODEL=gpt-a\n", encoding="utf-8")
+        prefs = services.load_preferences()
+        assert prefs["OPENAI_MODEL"] == "gpt-a"
+        prefs["OPENAI_MODEL"] = "mutated"
+        assert services.load_preferences()["OPENAI_MODEL"] == "gpt-a"
+
+        env_path = services.save_preferences({"OPENAI_MODEL": "gpt-b "})
+        assert services.load_preferences()["OPENAI_MODEL"] == "gpt-b"
+        mtime = env_path.stat().st_mtime_ns
+        services.save_preferences({"OPENAI_MODEL": "gpt-b"})
+        assert env_path.stat().st_mtime_ns == mtime
+
+        env_path.write_text("# note\nOPENAI_MODEL = gpt-edited\nEXTRA=1\n", encoding="utf-8")
+        assert services.load_preferences()["OPENAI_MODEL"] == "gpt-edited"
+
+        services.save_preferences({"OPENAI_MODEL": "gpt-c"})
+        lines = env_path.read_text(encoding="utf-8").splitlines()
+        assert "OPENAI_MODEL=gpt-c" in lines
+        assert lines[-2:] == ["# note", "EXTRA=1"]
+    finally:
+        services._read_preferences.cache_clear()
+        db.reset_db_path()
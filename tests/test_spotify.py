@@ -0,0 +1,32 @@
+"""Tests for Spotify discovery with a stubbed client."""
+
+from unittest.mock import MagicMock, patch
+
+from digcrate.discovery.spotify import search_tracks
+
+
+def _item(track_id: str, name: str) -> dict:
+    return {
+        "id": track_id,
+        "name": name,
+        "artists": [{"name": "Artist"}],
+        "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+    }
+
+
+def test_search_tracks_fetches_audio_features_in_one_batch():
+    client = MagicMock()
+    client.search.return_value = {
+        "tracks": {"items": [_item("a", "Half Time"), _item("b", "No Features"), _item("c", "Too Slow")]}
+    }
+    client.audio_features.return_value = [
+        {"tempo": 87.0, "energy": 0.8, "key": 5},
+        None,
+        {"tempo": 150.0, "energy": 0.8, "key": 1},
+    ]
+
+    with patch("digcrate.discovery.spotify._get_spotify_client", return_value=client):
+        results = search_tracks(bpm=174.0, energy=0.7)
+
+    client.audio_features.assert_called_once_with(["a", "b", "c"])
+    assert [(t["name"], t["bpm"]) for t in results] == [("Half Time", 174.0)]